@@ -0,0 +1,65 @@
+"""The auth middleware user lookup, built per call and compiled once.
+
+Runs `User.where_actual_token(token, now).get_or_none(id=...)` against
+the auth models, first through the queryset builder and then through
+`User.compile(...)`, which reuses the rendered SQL with new bind values.
+
+    PYTHONPATH=. python benchmarks/compiled_queries.py --calls 20000
+"""
+from tortoise import Tortoise
+from diracore.support.http.auth.model import User, PersonalAccessToken
+
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import time
+
+
+async def timed(lookup, tokens: list, calls: int) -> float:
+    now = datetime.now()
+    started = time.perf_counter()
+    for number in range(calls):
+        user_id, token = tokens[number % len(tokens)]
+        if await lookup(token, user_id, now) is None:
+            raise RuntimeError("Token lookup found no user")
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def main(calls: int, repeat: int, db_url: str):
+    await Tortoise.init(db_url=db_url, modules={'models': ['diracore.support.http.auth.model']})
+    await Tortoise.generate_schemas()
+    expires_at = datetime.now() + timedelta(days=1)
+    tokens = []
+    for number in range(1, 101):
+        user = await User.create(id=number, username=f"user{number}", password=f"hash{number}")
+        token = await PersonalAccessToken.create(
+            user=user, name=f"Token-{number}", credentials=f"token-{number}", type='bearer', expires_at=expires_at)
+        tokens.append((user.id, token.credentials))
+
+    built = lambda token, user_id, now: User.where_actual_token(token, now).get_or_none(id=user_id)
+    compiled = User.compile(built)
+    lookups = {'builder': built, 'compiled': lambda token, user_id, now: compiled(token, user_id, now)}
+
+    timings = {name: [] for name in lookups}
+    for _ in range(repeat):
+        for name, lookup in lookups.items():
+            timings[name].append(await timed(lookup, tokens, calls))
+    print(f"{calls} lookups, best of {repeat}")
+    for name, values in timings.items():
+        print(f"{name:10}{min(values):>8.1f} us per lookup")
+    print(f"compiled plans: {sum(plan is not None for plan in compiled._plans.values())} of {len(compiled._plans)}")
+
+
+async def run(args):
+    try:
+        await main(args.calls, args.repeat, args.db_url)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--db-url', default='sqlite://:memory:')
+    asyncio.run(run(parser.parse_args()))
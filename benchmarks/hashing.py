@@ -0,0 +1,64 @@
+"""Event-loop stalls during a burst of password hashes.
+
+Hashes a burst of passwords the way concurrent register/login requests
+do, once with `bcrypt.hashpw` on the loop (what register and login did
+before the hasher service) and once through `BcryptHasher`, while a
+ticker task measures how late the loop gets back to it.
+
+    PYTHONPATH=. python benchmarks/hashing.py --requests 32 --rounds 12
+"""
+from diracore.support.hashing.hasher import BcryptHasher
+
+import argparse
+import asyncio
+import bcrypt
+import time
+
+
+async def inline_hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+async def ticker(interval: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def burst(make, count: int) -> tuple[float, float, float]:
+    """Wall time of `count` concurrent hashes, and the worst and mean loop lag meanwhile."""
+    lags, stop = [], asyncio.Event()
+    ticking = asyncio.create_task(ticker(0.001, lags, stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await asyncio.gather(*(make(f"password-{number}") for number in range(count)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticking
+    return elapsed, max(lags), sum(lags) / len(lags)
+
+
+async def main(count: int, rounds: int, workers: int):
+    hasher = BcryptHasher(rounds=rounds, max_workers=workers)
+    paths = {
+        'inline bcrypt': lambda password: inline_hash(password, rounds),
+        f"BcryptHasher ({workers} workers)": hasher.make,
+    }
+    print(f"{count} concurrent hashes, {rounds} rounds")
+    print(f"{'':28}{'total':>10}{'max lag':>12}{'mean lag':>12}")
+    try:
+        for name, make in paths.items():
+            elapsed, worst, mean = await burst(make, count)
+            print(f"{name:28}{elapsed * 1000:>7.0f} ms{worst * 1000:>9.1f} ms{mean * 1000:>9.2f} ms")
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds, args.workers))
@@ -0,0 +1,103 @@
+"""Cost of dirty-field tracking on hydration.
+
+Loads the same rows into a diracore model (which snapshots column values
+for `save()`) and into a plain Tortoise model with identical columns.
+
+    PYTHONPATH=. python benchmarks/hydration.py --rows 10000 --repeat 5
+"""
+from tortoise import Tortoise, fields
+from tortoise.models import Model as TortoiseModel
+from diracore.database.model import Model
+
+import argparse
+import asyncio
+import gc
+import time
+
+
+class Columns:
+    id = fields.IntField(pk=True)
+    name = fields.CharField(max_length=100)
+    email = fields.CharField(max_length=200)
+    active = fields.BooleanField(default=True)
+    score = fields.FloatField(default=0)
+    visits = fields.IntField(default=0)
+    bio = fields.TextField(null=True)
+    settings = fields.JSONField(default=dict)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+
+class Tracked(Columns, Model):
+    class Meta:
+        table = 'bench_tracked'
+
+
+class Plain(Columns, TortoiseModel):
+    class Meta:
+        table = 'bench_plain'
+
+
+def timed(timings: list):
+    gc.collect()
+    started = time.perf_counter()
+    return lambda: timings.append(time.perf_counter() - started)
+
+
+async def measure(models: tuple, rows: list, repeat: int) -> dict:
+    """Best hydration and all() times per model, alternating models to even out drift."""
+    timings = {model: ([], []) for model in models}
+    for _ in range(repeat):
+        for model, (hydrate, query) in timings.items():
+            init_from_db = model._init_from_db
+            done = timed(hydrate)
+            for row in rows:
+                init_from_db(**row)
+            done()
+
+            done = timed(query)
+            await model.all()
+            done()
+    return {model.__name__: (min(hydrate) * 1000, min(query) * 1000) for model, (hydrate, query) in timings.items()}
+
+
+async def main(count: int, repeat: int, db_url: str):
+    await Tortoise.init(db_url=db_url, modules={'models': ['__main__']})
+    await Tortoise.generate_schemas()
+    for model in (Tracked, Plain):
+        await model.bulk_create([
+            model(id=number, name=f"user {number}", email=f"user{number}@example.com", bio='x' * 200,
+                  settings={'theme': 'dark', 'tags': ['a', 'b']})
+            for number in range(1, count + 1)
+        ], batch_size=1000)
+    rows = await Tortoise.get_connection('default').execute_query_dict('SELECT * FROM bench_plain')
+
+    results = await measure((Plain, Tracked), rows, repeat)
+    plain_hydrate, plain_query = results['Plain']
+    print(f"{count} rows, best of {repeat}")
+    print(f"{'':10}{'_init_from_db':>16}{'all()':>12}")
+    for name, (hydrate, query) in results.items():
+        print(f"{name:10}{hydrate:>13.1f} ms{query:>9.1f} ms")
+    tracked_hydrate, tracked_query = results['Tracked']
+    print(f"{'overhead':10}{tracked_hydrate / plain_hydrate - 1:>15.0%}{tracked_query / plain_query - 1:>11.0%}")
+
+    instances = await Tracked.all()
+    started = time.perf_counter()
+    for instance in instances:
+        await instance.save()
+    print(f"save() of {count} unchanged instances: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+async def run(args):
+    try:
+        await main(args.rows, args.repeat, args.db_url)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db-url', default='sqlite://:memory:')
+    asyncio.run(run(parser.parse_args()))
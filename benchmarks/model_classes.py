@@ -0,0 +1,79 @@
+"""Model class creation and class-level queryset access.
+
+Creates 200 model classes the way importing a large app does, then builds
+a million querysets through the class with `Model.filter(...)` and with a
+custom queryset method (`Model.paid()`), which the metaclass forwards. The
+lookup alone (`Model.paid`) is the forwarding overhead; a plain Tortoise
+model's `filter()` is the baseline.
+
+    PYTHONPATH=. python benchmarks/model_classes.py --models 200 --calls 1000000
+"""
+from tortoise import Tortoise, fields
+from tortoise.models import Model as TortoiseModel
+from diracore.database.model import Model
+from diracore.database.queryset import QuerySet
+
+import argparse
+import asyncio
+import sys
+import time
+
+
+class OrderQuerySet(QuerySet):
+    def paid(self):
+        return self.filter(total__gt=0)
+
+
+class PlainOrder(TortoiseModel):
+    id = fields.IntField(pk=True)
+    total = fields.IntField(default=0)
+
+
+def define_models(count: int) -> list:
+    module = sys.modules[__name__]
+    models = []
+    for number in range(count):
+        name = f"BenchCustomerOrder{number}"
+        model = type(name, (Model,), {
+            '__module__': __name__,
+            'id': fields.IntField(pk=True),
+            'reference': fields.CharField(max_length=64),
+            'total': fields.IntField(default=0),
+            'QuerySet': OrderQuerySet,
+        })
+        setattr(module, name, model)
+        models.append(model)
+    return models
+
+
+async def main(count: int, calls: int):
+    started = time.perf_counter()
+    models = define_models(count)
+    created = time.perf_counter() - started
+    print(f"{count} model classes: {created * 1000:.1f} ms ({created / count * 1e6:.0f} us per class)")
+
+    await Tortoise.init(db_url='sqlite://:memory:', modules={'models': [__name__]})
+    model = models[0]
+    for label, call in (('Tortoise Model.filter(id=n)', lambda number: PlainOrder.filter(id=number)),
+                        ('Model.filter(id=n)', lambda number: model.filter(id=number)),
+                        ('Model.paid()', lambda number: model.paid()),
+                        ('Model.paid (lookup only)', lambda number: model.paid)):
+        started = time.perf_counter()
+        for number in range(calls):
+            call(number)
+        elapsed = time.perf_counter() - started
+        print(f"{calls} {label} calls: {elapsed * 1000:.0f} ms ({elapsed / calls * 1e6:.2f} us per call)")
+
+
+async def run(args):
+    try:
+        await main(args.models, args.calls)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', type=int, default=200)
+    parser.add_argument('--calls', type=int, default=1000000)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""Read paths of a list endpoint: model instances, dicts and rows().
+
+Times fetching the same rows with `all()`, `values()` and `rows()`, and
+serializing each result with orjson.
+
+    PYTHONPATH=. python benchmarks/rows.py --rows 10000 --repeat 10
+"""
+from tortoise import Tortoise, fields
+from diracore.database.model import Model
+
+import argparse
+import asyncio
+import gc
+import orjson
+import time
+
+
+class Article(Model):
+    id = fields.IntField(pk=True)
+    title = fields.CharField(max_length=200)
+    slug = fields.CharField(max_length=200)
+    published = fields.BooleanField(default=True)
+    views = fields.IntField(default=0)
+    rating = fields.FloatField(default=0)
+    summary = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = 'bench_articles'
+
+
+COLUMNS = ('id', 'title', 'slug', 'published', 'views', 'rating', 'summary', 'created_at')
+
+READS = {
+    'all()': lambda: Article.all(),
+    'values()': lambda: Article.all().values(*COLUMNS),
+    'rows()': lambda: Article.query().rows(*COLUMNS),
+}
+
+
+def serialize(result):
+    if result and isinstance(result[0], Model):
+        # What a resource does with instances: pick the columns into a dict
+        result = [{name: getattr(instance, name) for name in COLUMNS} for instance in result]
+    return orjson.dumps(result)
+
+
+async def measure(repeat: int) -> dict:
+    """Best fetch and fetch + serialize times per read path, alternating paths to even out drift."""
+    timings = {name: ([], []) for name in READS}
+    for _ in range(repeat):
+        for name, (fetch, total) in timings.items():
+            gc.collect()
+            started = time.perf_counter()
+            result = await READS[name]()
+            fetched = time.perf_counter()
+            serialize(result)
+            fetch.append(fetched - started)
+            total.append(time.perf_counter() - started)
+    return {name: (min(fetch) * 1000, min(total) * 1000) for name, (fetch, total) in timings.items()}
+
+
+async def main(count: int, repeat: int, db_url: str):
+    await Tortoise.init(db_url=db_url, modules={'models': ['__main__']})
+    await Tortoise.generate_schemas()
+    await Article.bulk_create([
+        Article(id=number, title=f"Article {number}", slug=f"article-{number}", views=number,
+                rating=number / 7, summary='x' * 200)
+        for number in range(1, count + 1)
+    ], batch_size=1000)
+
+    results = await measure(repeat)
+    print(f"{count} rows, best of {repeat}")
+    print(f"{'':10}{'fetch':>12}{'+ orjson':>12}")
+    for name, (fetch, total) in results.items():
+        print(f"{name:10}{fetch:>9.1f} ms{total:>9.1f} ms")
+
+
+async def run(args):
+    try:
+        await main(args.rows, args.repeat, args.db_url)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--db-url', default='sqlite://:memory:')
+    asyncio.run(run(parser.parse_args()))
@@ -45,7 +45,7 @@ class Container:
             return concrete
         return closure()
 
-    def make(self, abstract: ABSTRACT, *params, default=DEFAULT|None) -> ABSTRACT|DEFAULT|None:
+    def make(self, abstract: ABSTRACT, *params, default: DEFAULT = None) -> ABSTRACT|DEFAULT|None:
         return self.resolve(abstract, params, default)
     
     def resolve(self, abstract, params=None, default=None):
@@ -0,0 +1,54 @@
+from tortoise.backends.asyncpg.client import AsyncpgDBClient, TransactionWrapper as AsyncpgTransactionWrapper
+from tortoise.backends.base.client import PoolConnectionWrapper, TransactionContextPooled
+from diracore.database.instrumentation import InstrumentedClientMixin
+from diracore.database.pool import PoolStats
+
+import asyncio
+import time
+
+
+class InstrumentedPoolConnectionWrapper(PoolConnectionWrapper):
+    async def __aenter__(self):
+        await self.ensure_connection()
+        stats: PoolStats = self.client.pool_stats
+        started = time.perf_counter()
+        stats.waiters += 1
+        try:
+            self.connection = await self.client._pool.acquire(timeout=self.client.acquire_timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            stats.waiters -= 1
+        stats.observe((time.perf_counter() - started) * 1000)
+        return self.connection
+
+
+class AsyncpgClient(InstrumentedClientMixin, AsyncpgDBClient):
+    """asyncpg client with an acquire timeout, pool statistics and query timing.
+
+    Pool sizing (minsize, maxsize, max_queries,
+    max_inactive_connection_lifetime) is handled by the base client;
+    `acquire_timeout` is the only extra credential.
+    """
+
+    def __init__(self, *args, acquire_timeout: float = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquire_timeout = float(acquire_timeout) if acquire_timeout else None
+        self.pool_stats = PoolStats()
+
+    def acquire_connection(self):
+        return InstrumentedPoolConnectionWrapper(self)
+
+    def _in_transaction(self):
+        return TransactionContextPooled(TransactionWrapper(self))
+
+    def get_pool_stats(self) -> dict:
+        return self.pool_stats.to_dict(self._pool)
+
+
+class TransactionWrapper(InstrumentedClientMixin, AsyncpgTransactionWrapper):
+    pass
+
+
+client_class = AsyncpgClient
@@ -0,0 +1,17 @@
+from tortoise.backends.base.client import TransactionContext
+from tortoise.backends.sqlite.client import SqliteClient as BaseSqliteClient, TransactionWrapper as SqliteTransactionWrapper
+from diracore.database.instrumentation import InstrumentedClientMixin
+
+
+class SqliteClient(InstrumentedClientMixin, BaseSqliteClient):
+    """sqlite client with query timing."""
+
+    def _in_transaction(self):
+        return TransactionContext(TransactionWrapper(self))
+
+
+class TransactionWrapper(InstrumentedClientMixin, SqliteTransactionWrapper):
+    pass
+
+
+client_class = SqliteClient
@@ -0,0 +1,203 @@
+from typing import Any, AsyncIterable, Iterable
+from tortoise import timezone
+
+# Bind parameters per statement the drivers accept
+PARAMETER_LIMITS = {"postgres": 32767, "sqlite": 999, "mysql": 65535}
+
+
+async def batched(rows: Iterable | AsyncIterable, size: int):
+    """Yield lists of at most `size` rows from a sync or async iterable."""
+    chunk = []
+    if hasattr(rows, '__aiter__'):
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class BulkStatement:
+    """Column mapping and row conversion shared by the bulk writes of one model."""
+
+    def __init__(self, model, fields: list = None, using_db=None) -> None:
+        self.model = model
+        self.db = using_db or model._choose_db(True)
+        self.dialect = self.db.capabilities.dialect
+        meta = model._meta
+        self.fields = list(fields) if fields else [
+            name for name in meta.db_fields
+            if not (name == meta.pk_attr and meta.pk.generated)
+        ]
+        self.fields_map = {name: meta.fields_map[name] for name in self.fields}
+        self.columns = [meta.fields_db_projection[name] for name in self.fields]
+        self.table = meta.db_table
+        # Keys every dict row must carry; the other fields fall back to their defaults
+        self.required: list = []
+
+    def record(self, row: dict | tuple) -> tuple:
+        if isinstance(row, dict) and self.required:
+            missing = [name for name in self.required if name not in row]
+            if missing:
+                raise ValueError(f"Row is missing {', '.join(missing)}: {row!r}")
+        values = row if not isinstance(row, dict) else [self.value_of(row, name) for name in self.fields]
+        return tuple(
+            field.to_db_value(value, None) for field, value in zip(self.fields_map.values(), values)
+        )
+
+    @staticmethod
+    def has_default(field) -> bool:
+        return (field.default is not None or getattr(field, 'auto_now', False)
+                or getattr(field, 'auto_now_add', False))
+
+    def value_of(self, row: dict, name: str) -> Any:
+        if name in row:
+            return row[name]
+        field = self.fields_map[name]
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            return timezone.now()
+        return field.default() if callable(field.default) else field.default
+
+    def quote(self, name: str) -> str:
+        return f"`{name}`" if self.dialect == "mysql" else f'"{name}"'
+
+    def placeholder(self, index: int) -> str:
+        match self.dialect:
+            case "postgres": return f"${index}"
+            case "mysql": return "%s"
+        return "?"
+
+    def placeholders(self, count: int, offset: int = 0) -> str:
+        return ", ".join(self.placeholder(offset + index + 1) for index in range(count))
+
+    def rows_per_statement(self, chunk_size: int) -> int:
+        limit = PARAMETER_LIMITS.get(self.dialect, 999)
+        return max(1, min(chunk_size, limit // len(self.columns)))
+
+    def insert_sql(self, rows: int = 1) -> str:
+        columns = ", ".join(self.quote(column) for column in self.columns)
+        width = len(self.columns)
+        values = ", ".join(f"({self.placeholders(width, row * width)})" for row in range(rows))
+        return f"INSERT INTO {self.quote(self.table)} ({columns}) VALUES {values}"
+
+    def upsert_sql(self, rows: int, conflict: list, update: list) -> str:
+        sql = self.insert_sql(rows)
+        update_columns = [self.model._meta.fields_db_projection[name] for name in update]
+        if self.dialect == "mysql":
+            if not update_columns:
+                return sql.replace("INSERT INTO", "INSERT IGNORE INTO", 1)
+            assignments = ", ".join(f"{self.quote(column)} = VALUES({self.quote(column)})" for column in update_columns)
+            return f"{sql} ON DUPLICATE KEY UPDATE {assignments}"
+
+        target = ", ".join(self.quote(self.model._meta.fields_db_projection[name]) for name in conflict)
+        if not update_columns:
+            return f"{sql} ON CONFLICT ({target}) DO NOTHING"
+        assignments = ", ".join(f"{self.quote(column)} = EXCLUDED.{self.quote(column)}" for column in update_columns)
+        return f"{sql} ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+    def update_sql(self, key: str) -> str:
+        key_column = self.model._meta.fields_db_projection[key]
+        columns = [column for name, column in zip(self.fields, self.columns) if name != key]
+        assignments = ", ".join(
+            f"{self.quote(column)} = {self.placeholder(index + 1)}" for index, column in enumerate(columns)
+        )
+        return (f"UPDATE {self.quote(self.table)} SET {assignments} "
+                f"WHERE {self.quote(key_column)} = {self.placeholder(len(columns) + 1)}")
+
+
+async def insert_many(model, rows, fields: list = None, chunk_size: int = 1000, using_db=None) -> int:
+    statement = BulkStatement(model, fields, using_db)
+    # asyncpg clients stream through COPY, everything else through a batched executemany
+    copy = hasattr(getattr(statement.db, 'connection_class', None), 'copy_records_to_table')
+    inserted = 0
+    async for chunk in batched(rows, chunk_size):
+        records = [statement.record(row) for row in chunk]
+        if copy:
+            async with statement.db.acquire_connection() as connection:
+                await connection.copy_records_to_table(statement.table, records=records, columns=statement.columns)
+        else:
+            await statement.db.execute_many(statement.insert_sql(), records)
+        inserted += len(records)
+    return inserted
+
+
+async def upsert_many(model, rows, conflict: list, update: list = None, fields: list = None,
+                      chunk_size: int = 1000, using_db=None) -> int:
+    conflict = [conflict] if isinstance(conflict, str) else list(conflict)
+    statement = None
+    written = 0
+    async for chunk in batched(rows, chunk_size):
+        if statement is None:
+            statement = upsert_statement(model, chunk[0], conflict, fields, using_db)
+            if update is None:
+                # Only what the caller wrote is updated; defaults fill in new rows alone
+                written_fields = statement.required or statement.fields
+                update = [name for name in written_fields if name not in conflict]
+                if update:
+                    # As in Model.save(), updated rows also refresh their auto_now columns
+                    update += [
+                        name for name, field in statement.fields_map.items()
+                        if getattr(field, 'auto_now', False) and name not in update and name not in conflict
+                    ]
+        per_statement = statement.rows_per_statement(chunk_size)
+        for offset in range(0, len(chunk), per_statement):
+            part = chunk[offset:offset + per_statement]
+            values = [value for row in part for value in statement.record(row)]
+            await statement.db.execute_query(statement.upsert_sql(len(part), conflict, update), values)
+            written += len(part)
+    return written
+
+
+def upsert_statement(model, first_row, conflict: list, fields: list = None, using_db=None) -> BulkStatement:
+    if fields is None and isinstance(first_row, dict):
+        supplied = list(first_row)
+        defaults = BulkStatement(model, None, using_db)
+        statement = BulkStatement(model, supplied + [
+            name for name, field in defaults.fields_map.items()
+            if name not in supplied and defaults.has_default(field)
+        ], using_db)
+        statement.required = supplied
+        return statement
+
+    statement = BulkStatement(model, fields, using_db)
+    if fields is None and any(name not in statement.fields for name in conflict):
+        # The conflict target (usually a generated pk) must be written to be matched
+        statement = BulkStatement(model, [name for name in conflict if name not in statement.fields]
+                                  + statement.fields, using_db)
+    if fields is not None and isinstance(first_row, dict):
+        statement.required = list(fields)
+    return statement
+
+
+async def update_many(model, rows, fields: list = None, key: str = None,
+                      chunk_size: int = 1000, using_db=None) -> int:
+    key = key or model._meta.pk_attr
+    statement = sql = None
+    updated = 0
+    async for chunk in batched(rows, chunk_size):
+        if statement is None:
+            if fields is None and not isinstance(chunk[0], dict):
+                raise ValueError("update_many() needs `fields` when rows are tuples.")
+            names = list(fields or chunk[0])
+            if key not in names:
+                names.append(key)
+            statement = BulkStatement(model, names, using_db)
+            if isinstance(chunk[0], dict):
+                # A missing column would be written as its default
+                statement.required = names
+            sql = statement.update_sql(key)
+            key_index = names.index(key)
+        records = [statement.record(row) for row in chunk]
+        # The key binds the WHERE clause, which comes after every SET column
+        await statement.db.execute_many(sql, [
+            record[:key_index] + record[key_index + 1:] + (record[key_index],) for record in records
+        ])
+        updated += len(records)
+    return updated
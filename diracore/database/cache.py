@@ -0,0 +1,320 @@
+from collections import OrderedDict
+from datetime import date, datetime, time as time_of_day, timedelta
+from decimal import Decimal
+from uuid import UUID
+from redis.asyncio import Redis as ARedis
+from redis.exceptions import RedisError
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import orjson
+import time
+
+
+def model_tag(model) -> str:
+    return f"model:{model._meta.db_table}"
+
+
+_PLAIN = frozenset((str, int, float, bool, type(None)))
+
+_DECODERS = {
+    'dt': datetime.fromisoformat,
+    'd': date.fromisoformat,
+    't': time_of_day.fromisoformat,
+    'td': lambda parts: timedelta(*parts),
+    'dec': Decimal,
+    'uuid': UUID,
+    'b': base64.b64decode,
+    'j': lambda value: value,
+}
+
+
+def _tagged(value) -> list:
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    if isinstance(value, time_of_day):
+        return ['t', value.isoformat()]
+    if isinstance(value, timedelta):
+        return ['td', [value.days, value.seconds, value.microseconds]]
+    if isinstance(value, Decimal):
+        return ['dec', str(value)]
+    if isinstance(value, UUID):
+        return ['uuid', str(value)]
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return ['b', base64.b64encode(value).decode()]
+    if isinstance(value, (dict, list)):
+        return ['j', value]
+    raise TypeError(f"Cannot cache a {type(value).__name__} column value")
+
+
+def encode_rows(rows: list) -> bytes:
+    """Rows as JSON; values JSON has no type for become `[type, text]` pairs and come back as read."""
+    return orjson.dumps([
+        {name: value if type(value) in _PLAIN else _tagged(value) for name, value in row.items()}
+        for row in rows
+    ])
+
+
+def decode_rows(payload: bytes) -> list:
+    rows = orjson.loads(payload)
+    for row in rows:
+        for name, value in row.items():
+            if type(value) is list:
+                row[name] = _DECODERS[value[0]](value[1])
+    return rows
+
+
+# Drops the entries of the tags that have any and publishes only those, in one round trip.
+# Every tag's generation is bumped, so results of queries still running are not stored.
+# KEYS are the tag sets then their generations, ARGV the entry key prefix, the channel and the tag names.
+INVALIDATE_SCRIPT = """
+local tags = #KEYS / 2
+local invalidated = {}
+for i = 1, tags do
+    redis.call('INCR', KEYS[tags + i])
+    local keys = redis.call('ZRANGE', KEYS[i], 0, -1)
+    if #keys > 0 then
+        for _, key in ipairs(keys) do
+            redis.call('DEL', ARGV[1] .. key)
+        end
+        redis.call('DEL', KEYS[i])
+        table.insert(invalidated, ARGV[i + 2])
+    end
+end
+if #invalidated > 0 then
+    redis.call('PUBLISH', ARGV[2], cjson.encode(invalidated))
+end
+return #invalidated
+"""
+
+# Stores an entry unless one of its tags was invalidated since its query started.
+# KEYS are the entry, the tag sets then their generations; ARGV the payload, the ttl,
+# the current time, the entry's expiry, the entry key and the generations seen before the query.
+PUT_SCRIPT = """
+local tags = (#KEYS - 1) / 2
+for i = 1, tags do
+    if (redis.call('GET', KEYS[1 + tags + i]) or '0') ~= ARGV[5 + i] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 1, tags do
+    redis.call('ZREMRANGEBYSCORE', KEYS[1 + i], '-inf', ARGV[3])
+    redis.call('ZADD', KEYS[1 + i], ARGV[4], ARGV[5])
+end
+return 1
+"""
+
+
+class QueryCache:
+    """Result rows of cached querysets, in a local LRU backed by Redis.
+
+    Entries are keyed by the compiled SQL and grouped by tags. Each tag is a
+    Redis sorted set of entry keys scored by their expiry, so expired
+    members are pruned instead of piling up. Invalidating a tag drops its
+    entries in Redis and is published on `channel`, so every worker drops
+    its local copies as well. Tags nothing was ever cached under are
+    announced on the same channel the first time they are used, so saving
+    a model that is never cached costs no round trip. Each tag also has a
+    generation that invalidation bumps, and rows read before an
+    invalidation are not stored after it. Local copies are only served
+    while the invalidation listener of the current event loop is subscribed.
+    """
+
+    def __init__(self, redis: ARedis = None, max_entries: int = 1024,
+                 prefix: str = 'db:cache:', channel: str = 'db:cache:invalidate') -> None:
+        self.redis = redis
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.channel = channel
+        self._local: OrderedDict[str, tuple[float, list, tuple]] = OrderedDict()
+        self._tags: dict[str, set] = {}
+        self._generations: dict[str, int] = {}
+        self._known: set[str] = set()
+        self._listener: asyncio.Task = None
+        self._listening = False
+        self._invalidate_script = redis.register_script(INVALIDATE_SCRIPT) if redis is not None else None
+        self._put_script = redis.register_script(PUT_SCRIPT) if redis is not None else None
+
+    @staticmethod
+    def key(connection_name: str, query: str, values=None) -> str:
+        return hashlib.blake2b(f"{connection_name}\0{query}\0{values!r}".encode(), digest_size=16).hexdigest()
+
+    async def get(self, key: str, ttl: float, tags: tuple = ()) -> tuple[list | None, tuple | None]:
+        """`(rows, None)` on a hit; on a miss `(None, version)`, the tag generations `put()` checks."""
+        self.listen()
+        entry = self._local.get(key) if self._listening or self.redis is None else None
+        if entry is not None:
+            expires_at, rows, _ = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return rows, None
+            self._forget(key)
+        local = tuple(self._generations.get(tag, 0) for tag in tags)
+        if self.redis is None:
+            return None, (local, None)
+        announced = [tag for tag in tags if tag not in self._known]
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(self.prefix + key)
+                if tags:
+                    pipe.mget([self.prefix + f"gen:{tag}" for tag in tags])
+                if announced:
+                    # Before the query runs, so saves from here on invalidate these tags
+                    pipe.sadd(self.prefix + 'tags', *announced)
+                    pipe.publish(self.channel, json.dumps({'cached': announced}))
+                payload, *rest = await pipe.execute()
+        except RedisError as e:
+            logging.warning(f"Query cache read failed: {e}")
+            return None, (local, None)
+        self._known.update(announced)
+        if payload is None:
+            remote = tuple((generation or b'0').decode() for generation in rest[0]) if tags else ()
+            return None, (local, remote)
+        rows = decode_rows(payload)
+        self._remember(key, rows, ttl, tags)
+        return rows, None
+
+    async def put(self, key: str, rows: list, ttl: float, tags: tuple, version: tuple):
+        local, remote = version
+        if self.redis is not None:
+            if remote is None:
+                return
+            try:
+                payload = encode_rows(rows)
+            except TypeError as e:
+                logging.debug(f"Query result is not cacheable: {e}")
+                return
+            now = time.time()
+            try:
+                stored = await self._put_script(
+                    keys=[self.prefix + key, *(self.prefix + f"tag:{tag}" for tag in tags),
+                          *(self.prefix + f"gen:{tag}" for tag in tags)],
+                    args=[payload, max(1, int(ttl)), now, now + ttl, key, *remote])
+            except RedisError as e:
+                logging.warning(f"Query cache write failed: {e}")
+                return
+            if not stored:
+                return
+        if local == tuple(self._generations.get(tag, 0) for tag in tags):
+            self._remember(key, rows, ttl, tags)
+
+    async def invalidate(self, *tags: str):
+        self.forget_tags(tags)
+        if self.redis is None or not tags:
+            return
+        self.listen()
+        if self._listening and self._known.isdisjoint(tags):
+            # Nothing was ever cached under these tags
+            return
+        try:
+            await self._invalidate_script(
+                keys=[*(self.prefix + f"tag:{tag}" for tag in tags), *(self.prefix + f"gen:{tag}" for tag in tags)],
+                args=[self.prefix, self.channel, *tags])
+        except RedisError as e:
+            logging.warning(f"Query cache invalidation failed: {e}")
+
+    def forget_tags(self, tags):
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in self._tags.pop(tag, ()):
+                self._forget(key)
+
+    def listen(self):
+        """Run the invalidation listener on the current event loop.
+
+        Queue jobs and console commands run their own loops, so the listener
+        starts with the first cached query or invalidation of a loop rather than at boot.
+        """
+        if self.redis is None:
+            return
+        loop = asyncio.get_running_loop()
+        if self._listener is not None and not self._listener.done() and self._listener.get_loop() is loop:
+            return
+        self._listening = False
+        self._listener = loop.create_task(self._listen(), name='db:cache-invalidations')
+
+    async def start(self):
+        self.listen()
+
+    async def stop(self):
+        listener, self._listener = self._listener, None
+        self._listening = False
+        if listener is None or listener.done() or listener.get_loop() is not asyncio.get_running_loop():
+            return
+        listener.cancel()
+        try:
+            await listener
+        except asyncio.CancelledError:
+            pass
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.channel)
+                # Read after subscribing, so no tag announced meanwhile is missed
+                self._known.update(tag.decode() for tag in await self.redis.smembers(self.prefix + 'tags'))
+                # Entries kept while nobody listened may have missed invalidations
+                self._local.clear()
+                self._tags.clear()
+                self._listening = True
+                async for message in pubsub.listen():
+                    data = json.loads(message["data"])
+                    if isinstance(data, dict):
+                        self._known.update(data['cached'])
+                    else:
+                        self.forget_tags(data)
+            except RedisError as e:
+                # Entries may be stale while disconnected, drop them all
+                logging.warning(f"Query cache invalidation listener failed: {e}")
+                self._listening = False
+                self._local.clear()
+                self._tags.clear()
+                await asyncio.sleep(1)
+
+    def _remember(self, key: str, rows: list, ttl: float, tags: tuple):
+        self._local[key] = (time.monotonic() + ttl, rows, tuple(tags))
+        self._local.move_to_end(key)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._local) > self.max_entries:
+            self._forget(next(iter(self._local)))
+
+    def _forget(self, key: str):
+        entry = self._local.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class CachingClient:
+    """Stands in for a connection while a cached queryset runs its SELECT."""
+
+    def __init__(self, db, cache: QueryCache, ttl: float, tags: tuple) -> None:
+        self._db = db
+        self._cache = cache
+        self._ttl = ttl
+        self._tags = tags
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    async def execute_query(self, query: str, values: list = None):
+        key = self._cache.key(self._db.connection_name, query, values)
+        rows, version = await self._cache.get(key, self._ttl, self._tags)
+        if rows is None:
+            _, result = await self._db.execute_query(query, values)
+            rows = [dict(row) for row in result]
+            await self._cache.put(key, rows, self._ttl, self._tags, version)
+        return len(rows), rows
@@ -0,0 +1,81 @@
+from diracore.main import app, cli, coro
+from diracore.database.manager import DatabaseManager
+
+from tabulate import tabulate
+import click
+
+@cli.command("db.pool")
+@click.argument('name', required=False)
+@coro
+async def pool_stats(name=None):
+    db: DatabaseManager = app.make('db')
+    connection = await db.connection(name)
+    if hasattr(connection, 'create_connection'):
+        await connection.create_connection(True)
+
+    rows = []
+    for connection_name, stats in db.pool_stats(name).items():
+        histogram = ', '.join(f"{bound}: {count}" for bound, count in stats['wait_histogram_ms'].items() if count)
+        rows.append([
+            connection_name, stats['size'], stats['idle'], stats['min_size'], stats['max_size'],
+            stats['waiters'], stats['timeouts'], f"{stats['wait_avg_ms']:.2f}", histogram or '-',
+        ])
+    headers = ['connection', 'size', 'idle', 'min', 'max', 'waiters', 'timeouts', 'avg wait ms', 'wait histogram ms']
+    click.echo(tabulate(rows, headers=headers, tablefmt="fancy_grid"))
+
+
+@cli.command("db.manifest")
+@click.option('--clear', is_flag=True, help='Remove the cached model manifest')
+@coro
+async def model_manifest(clear=False):
+    from tortoise import Tortoise
+
+    db: DatabaseManager = app.make('db')
+    database_config = db.database_config()
+    manifest = database_config.get_manifest()
+    if clear:
+        removed = manifest.clear()
+        click.echo(f"Model manifest {'removed' if removed else 'not found'}: {manifest.path}")
+        return
+
+    if not Tortoise._inited:
+        await db.connection()
+    contents = manifest.build(database_config.get_model_paths(), Tortoise.apps)
+    manifest.write(contents)
+    click.echo(f"Model manifest written to {manifest.path}: {len(contents['modules'])} modules, "
+               f"{len(contents['relations'])} models")
+
+
+@cli.command("db.search.rebuild")
+@click.argument('models', nargs=-1)
+@click.option('--chunk', default=1000, show_default=True, help='Rows indexed per batch')
+@coro
+async def search_rebuild(models=(), chunk=1000):
+    from tortoise import Tortoise
+    from diracore.database.search import SearchIndex, searchable_models
+
+    db: DatabaseManager = app.make('db')
+    if not Tortoise._inited:
+        await db.connection()
+    for model in searchable_models(Tortoise.apps):
+        if models and model.__name__ not in models:
+            continue
+        indexed = await SearchIndex.of(model).rebuild(chunk)
+        click.echo(f"Search index of {model.__name__} rebuilt: {indexed} rows")
+
+
+@cli.command("db.counters.reconcile")
+@click.argument('models', nargs=-1)
+@coro
+async def counters_reconcile(models=()):
+    from tortoise import Tortoise
+    from diracore.database.counters import install_counter_caches
+
+    db: DatabaseManager = app.make('db')
+    if not Tortoise._inited:
+        await db.connection()
+    for counter in install_counter_caches(Tortoise.apps):
+        if models and counter.model.__name__ not in models:
+            continue
+        updated = await counter.reconcile()
+        click.echo(f"{counter.model.__name__}.{counter.name}: {updated} rows corrected")
@@ -0,0 +1,139 @@
+from tortoise.exceptions import DoesNotExist, MultipleObjectsReturned
+from tortoise.queryset import QuerySet, CountQuery, ExistsQuery
+from tortoise import timezone
+from diracore.database.identity import adopt
+from datetime import datetime
+
+import logging
+import re
+
+_INT_MARKER = 7_300_000_000_000
+
+
+class CompiledPlan:
+    __slots__ = ("sql", "order", "kind", "single", "raise_does_not_exist", "limit", "offset")
+
+    def __init__(self, sql: str, order: list, query) -> None:
+        self.sql = sql
+        self.order = order
+        self.kind = type(query)
+        self.single = getattr(query, '_single', False)
+        self.raise_does_not_exist = getattr(query, '_raise_does_not_exist', False)
+        self.limit = getattr(query, '_limit', None)
+        self.offset = getattr(query, '_offset', None)
+
+
+class CompiledQuery:
+    """A queryset shape built once and re-run with new bind parameters.
+
+    The builder is called once per parameter-type signature with marker
+    values; the rendered SQL is kept with the markers swapped for
+    placeholders. Later calls skip query construction entirely and, since
+    the SQL text is identical, reuse the driver's prepared statement.
+    Shapes that cannot be compiled (unsupported parameter types, markers
+    folded into other literals or used more than once, prefetches) run
+    through the builder as usual.
+    """
+
+    def __init__(self, model, builder: callable) -> None:
+        self.model = model
+        self.builder = builder
+        self._plans: dict[tuple, CompiledPlan | None] = {}
+
+    async def __call__(self, *args):
+        db = self.model._choose_db()
+        dialect = db.capabilities.dialect
+        args = tuple(self.db_value(arg) for arg in args)
+        signature = (dialect, *(self.param_type(arg) for arg in args))
+        if signature not in self._plans:
+            self._plans[signature] = self.compile(dialect, args)
+        plan = self._plans[signature]
+        if plan is None:
+            return await self.builder(*args)
+        _, rows = await db.execute_query(plan.sql, [args[index] for index in plan.order])
+        return self.result(plan, rows)
+
+    def compile(self, dialect: str, args: tuple) -> CompiledPlan | None:
+        markers = [self.marker(index, arg, dialect) for index, arg in enumerate(args)]
+        if None in markers:
+            return None
+        try:
+            query = self.builder(*(value for value, _ in markers))
+            if not isinstance(query, (QuerySet, CountQuery, ExistsQuery)):
+                return None
+            if isinstance(query, QuerySet) and (query._prefetch_map or query._select_related):
+                return None
+            if query._db is None:
+                query._db = query._choose_db()
+            query._make_query()
+            sql = query.query.get_sql()
+        except Exception as e:
+            logging.debug(f"Query for {self.model.__name__} is not compilable: {e}")
+            return None
+
+        found = []
+        for index, (_, pattern) in enumerate(markers):
+            matches = list(pattern.finditer(sql))
+            if len(matches) != 1:
+                return None
+            found.append((matches[0].start(), matches[0].end(), index))
+        found.sort()
+
+        parts, order, position = [], [], 0
+        for number, (start, end, index) in enumerate(found, 1):
+            parts.append(sql[position:start])
+            parts.append(f"${number}" if dialect == "postgres" else ("%s" if dialect == "mysql" else "?"))
+            order.append(index)
+            position = end
+        parts.append(sql[position:])
+        return CompiledPlan(''.join(parts), order, query)
+
+    @staticmethod
+    def db_value(value):
+        """What DatetimeField.to_db_value does to a datetime filter value before it is rendered."""
+        if isinstance(value, datetime) and value.tzinfo is None and timezone.get_use_tz():
+            return timezone.make_aware(value, "UTC")
+        return value
+
+    @staticmethod
+    def param_type(value):
+        # Naive and aware datetimes compile differently
+        return (datetime, value.tzinfo is None) if isinstance(value, datetime) else type(value)
+
+    @staticmethod
+    def marker(index: int, value, dialect: str):
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, int):
+            marker = _INT_MARKER + index
+            return marker, re.compile(rf"(?<![\w.]){marker}(?![\w.])")
+        if isinstance(value, str):
+            marker = f"dcparam{index}x"
+            return marker, re.compile(rf"'{marker}'")
+        if isinstance(value, datetime) and dialect == "postgres" and value.tzinfo is not None:
+            # Other drivers compare datetimes as text, whose format the marker cannot capture.
+            # A naive datetime is read in the session time zone when rendered into the SQL but
+            # in the process's local zone when bound, so it is only compiled once made aware.
+            marker = datetime(2999, 12, 31, 23, 59, 58, 100000 + index, tzinfo=value.tzinfo)
+            return marker, re.compile(rf"'2999-12-31[ T]23:59:58\.{100000 + index}[^']*'")
+        return None
+
+    def result(self, plan: CompiledPlan, rows: list):
+        if issubclass(plan.kind, ExistsQuery):
+            return bool(rows)
+        if issubclass(plan.kind, CountQuery):
+            count = list(dict(rows[0]).values())[0] - (plan.offset or 0)
+            if plan.limit and count > plan.limit:
+                return plan.limit
+            return max(count, 0)
+
+        instances = adopt([self.model._init_from_db(**row) for row in rows])
+        if not plan.single:
+            return instances
+        if len(instances) == 1:
+            return instances[0]
+        if not instances:
+            if plan.raise_does_not_exist:
+                raise DoesNotExist("Object does not exist")
+            return None
+        raise MultipleObjectsReturned("Multiple objects returned, expected exactly one")
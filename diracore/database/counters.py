@@ -0,0 +1,140 @@
+from pypika import Query, Table, functions
+from pypika.terms import LiteralValue
+from tortoise import fields
+from tortoise.expressions import F
+from tortoise.signals import Signals
+from diracore.database.model import forget_model
+
+
+class CounterCache(fields.IntField):
+    """Column holding the number of related rows, kept current on every insert and delete.
+
+        class User(Model):
+            tokens_count = CounterCache('tokens', filter={'type': 'bearer'})
+
+    `relation` is a reverse foreign key of the model; `filter` limits the
+    counted rows with exact field matches. Rows written without instances
+    (`update()`, `delete()` on querysets, bulk writes) are not counted;
+    `db.counters.reconcile` recomputes the columns.
+    """
+
+    def __init__(self, relation: str, filter: dict = None, **kwargs) -> None:
+        kwargs.setdefault('default', 0)
+        super().__init__(**kwargs)
+        self.relation = relation
+        self.filter = dict(filter or {})
+        if any('__' in name for name in self.filter):
+            raise ValueError("CounterCache filters only support exact field matches.")
+
+
+class Counter:
+    """One `CounterCache` column resolved against its related model."""
+
+    def __init__(self, model, name: str, field: CounterCache) -> None:
+        relation = model._meta.fields_map[field.relation]
+        self.model = model
+        self.name = name
+        self.filter = field.filter
+        self.related = relation.related_model
+        self.key = relation.relation_field
+
+    def counts(self, instance, original: bool = False, written: list = None) -> tuple:
+        """Parent pk the instance counts towards and whether it matches the filter.
+
+        With `written`, only those columns are taken from the instance and the
+        rest from its loaded values, as they are in the database after the save.
+        """
+        loaded = instance.__dict__.get('_original', {})
+        value = lambda name: (
+            loaded[name] if name in loaded and (original or (written is not None and name not in written))
+            else getattr(instance, name, None)
+        )
+        return value(self.key), all(value(name) == expected for name, expected in self.filter.items())
+
+    async def add(self, pk, delta: int, using_db=None):
+        if pk is None or not delta:
+            return
+        await self.model.filter(pk=pk).using_db(using_db).update(**{self.name: F(self.name) + delta})
+        await forget_model(self.model)
+
+    async def created(self, instance, using_db):
+        pk, matches = self.counts(instance)
+        if matches:
+            await self.add(pk, 1, using_db)
+
+    async def updated(self, instance, using_db, update_fields=None):
+        if '_original' not in instance.__dict__:
+            return
+        before, after = self.counts(instance, original=True), self.counts(instance, written=update_fields or None)
+        if before == after:
+            return
+        if before[1]:
+            await self.add(before[0], -1, using_db)
+        if after[1]:
+            await self.add(after[0], 1, using_db)
+
+    async def deleted(self, instance, using_db):
+        pk, matches = self.counts(instance, original=True)
+        if matches:
+            await self.add(pk, -1, using_db)
+
+    def reconcile_sql(self, db) -> str:
+        """UPDATE of every parent whose stored count differs from the actual one."""
+        meta, related_meta = self.model._meta, self.related._meta
+        parent, child = Table(meta.db_table), Table(related_meta.db_table)
+        count = Query.from_(child).select(functions.Count('*')).where(
+            child[related_meta.fields_db_projection[self.key]] == parent[meta.db_pk_column])
+        for name, expected in self.filter.items():
+            field = related_meta.fields_map[name]
+            count = count.where(child[related_meta.fields_db_projection[name]] == field.to_db_value(expected, None))
+        count = LiteralValue(f"({count.get_sql()})")
+        column = parent[meta.fields_db_projection[self.name]]
+        query = db.query_class.update(parent).set(column, count).where(column != count)
+        return query.get_sql()
+
+    async def reconcile(self, using_db=None) -> int:
+        db = using_db or self.model._choose_db(True)
+        updated, _ = await db.execute_query(self.reconcile_sql(db))
+        if updated:
+            await forget_model(self.model)
+        return updated
+
+
+_counters: dict[type, list[Counter]] = {}
+
+
+def counters_of(model) -> list[Counter]:
+    return _counters.get(model, [])
+
+
+def install_counter_caches(apps: dict) -> list[Counter]:
+    """Resolve the `CounterCache` columns of all models and listen to their related models.
+
+    Relations only exist once Tortoise is initialised, so this runs after `Tortoise.init`.
+    """
+    _counters.clear()
+    installed = []
+    for models in apps.values():
+        for model in models.values():
+            for name, field in model._meta.fields_map.items():
+                if isinstance(field, CounterCache):
+                    counter = Counter(model, name, field)
+                    _counters.setdefault(counter.related, []).append(counter)
+                    installed.append(counter)
+    for related in _counters:
+        related.register_listener(Signals.post_save, count_saved)
+        related.register_listener(Signals.post_delete, count_deleted)
+    return installed
+
+
+async def count_saved(sender, instance, created, using_db, update_fields):
+    for counter in counters_of(sender):
+        if created:
+            await counter.created(instance, using_db)
+        else:
+            await counter.updated(instance, using_db, update_fields)
+
+
+async def count_deleted(sender, instance, using_db):
+    for counter in counters_of(sender):
+        await counter.deleted(instance, using_db)
@@ -0,0 +1,28 @@
+from contextvars import ContextVar
+
+_requested_fields: ContextVar[tuple] = ContextVar('db_requested_fields', default=None)
+
+
+def requested_fields() -> tuple | None:
+    """Fields the current request asked for with `?fields=`, if the route allows it."""
+    return _requested_fields.get()
+
+
+def request_fields(fields: tuple | None):
+    return _requested_fields.set(tuple(fields) if fields else None)
+
+
+def visible_fields(model) -> tuple:
+    hidden = set(getattr(model, 'hidden', ()))
+    return tuple(name for name in model._meta.fields_db_projection if name not in hidden)
+
+
+def parse_fields(model, value: str | None, allowed: tuple = None) -> tuple | None:
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    allowed = allowed or visible_fields(model)
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed)}.")
+    return fields
@@ -0,0 +1,60 @@
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+_current_map: ContextVar['IdentityMap'] = ContextVar('db_identity_map', default=None)
+
+
+class IdentityMap:
+    """Model instances loaded in one request or job, one object per primary key."""
+
+    def __init__(self) -> None:
+        self._instances: dict[type, dict] = {}
+
+    def get(self, model, pk):
+        return self._instances.get(model, {}).get(pk)
+
+    def add(self, instance):
+        """Register `instance`, or return the object already loaded for its pk."""
+        if getattr(instance, '_partial', False) or instance.pk is None:
+            return instance
+        return self._instances.setdefault(type(instance), {}).setdefault(instance.pk, instance)
+
+    def forget(self, model, pk=None):
+        if pk is None:
+            self._instances.pop(model, None)
+        else:
+            self._instances.get(model, {}).pop(pk, None)
+
+    def clear(self):
+        self._instances.clear()
+
+
+@contextmanager
+def identity_map():
+    identities = IdentityMap()
+    token = _current_map.set(identities)
+    try:
+        yield identities
+    finally:
+        _current_map.reset(token)
+        identities.clear()
+
+
+def current_identity_map() -> IdentityMap | None:
+    return _current_map.get()
+
+
+def adopt(instances):
+    """Swap freshly loaded instances for the ones already in the current map."""
+    identities = _current_map.get()
+    if identities is None:
+        return instances
+    if isinstance(instances, list):
+        return [identities.add(instance) for instance in instances]
+    return identities.add(instances) if instances is not None else None
+
+
+async def forget_identity(sender, instance, *args, **kwargs):
+    identities = _current_map.get()
+    if identities is not None and identities.get(sender, instance.pk) is not instance:
+        identities.forget(sender, instance.pk)
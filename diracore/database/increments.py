@@ -0,0 +1,136 @@
+from pypika import Case, Table
+from redis.asyncio import Redis as ARedis
+from redis.exceptions import RedisError, ResponseError
+from diracore.database.cache import model_tag
+from diracore.database.queryset import query_cache
+from diracore.support.periodic import PeriodicTask
+
+import logging
+import uuid
+
+
+class IncrementBuffer:
+    """Write-behind buffer for hot counter columns.
+
+    `add()` only accumulates the delta, in Redis (one HINCRBY per call,
+    shared by every worker) or in process. A periodic flush writes all
+    pending deltas of a model in one UPDATE ... SET n = n + CASE ...
+    statement, so a busy row costs one write per flush interval instead of
+    one per increment. `pending()` reports what is not written yet.
+    """
+
+    batch_size: int = 500
+
+    def __init__(self, redis: ARedis = None, flush_interval: float = 5, prefix: str = 'db:increments:') -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self._pending: dict[tuple[type, str], dict] = {}
+        self._models: dict[str, type] = {}
+        self._flusher = PeriodicTask(self.flush, flush_interval, name='db:increments-flush')
+
+    def start(self):
+        self._flusher.start()
+
+    async def stop(self):
+        await self._flusher.stop(run_once=True)
+
+    def model_key(self, model) -> str:
+        key = f"{model._meta.app}.{model.__name__}"
+        self._models[key] = model
+        return key
+
+    def hash_key(self, model, field: str) -> str:
+        return f"{self.prefix}{self.model_key(model)}:{field}"
+
+    async def add(self, model, pk, field: str, by: int = 1):
+        if field not in model._meta.fields_db_projection:
+            raise ValueError(f"{model.__name__} has no field '{field}'.")
+        self.start()
+        pk = model._meta.pk.to_python_value(pk)
+        if self.redis is None:
+            deltas = self._pending.setdefault((model, field), {})
+            deltas[pk] = deltas.get(pk, 0) + by
+            return
+        key = self.hash_key(model, field)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, str(pk), by)
+            pipe.sadd(f"{self.prefix}keys", key)
+            await pipe.execute()
+
+    async def pending(self, model, pk, field: str) -> int:
+        pk = model._meta.pk.to_python_value(pk)
+        if self.redis is None:
+            return self._pending.get((model, field), {}).get(pk, 0)
+        try:
+            return int(await self.redis.hget(self.hash_key(model, field), str(pk)) or 0)
+        except RedisError as e:
+            logging.warning(f"Reading pending increments failed: {e}")
+            return 0
+
+    async def flush(self):
+        batches = await (self._take_local() if self.redis is None else self._take_redis())
+        grouped: dict[type, dict[str, dict]] = {}
+        for (model, field), deltas in batches.items():
+            grouped.setdefault(model, {})[field] = deltas
+        for model, fields in grouped.items():
+            try:
+                await self._write(model, fields)
+            except Exception:
+                logging.exception(f"Flushing increments of {model.__name__} failed, keeping them pending")
+                for field, deltas in fields.items():
+                    for pk, delta in deltas.items():
+                        await self.add(model, pk, field, delta)
+
+    async def _take_local(self) -> dict:
+        batches, self._pending = self._pending, {}
+        return batches
+
+    async def _take_redis(self) -> dict:
+        from tortoise import Tortoise
+
+        batches = {}
+        for key in await self.redis.smembers(f"{self.prefix}keys"):
+            key = key.decode() if isinstance(key, bytes) else key
+            await self.redis.srem(f"{self.prefix}keys", key)
+            # Renaming hands the hash to exactly one flushing worker; new increments start a fresh one
+            taken = f"{key}:flushing:{uuid.uuid4().hex}"
+            try:
+                await self.redis.rename(key, taken)
+            except ResponseError:
+                continue
+            deltas = await self.redis.hgetall(taken)
+            await self.redis.delete(taken)
+
+            model_key, field = key[len(self.prefix):].rsplit(':', 1)
+            model = self._models.get(model_key)
+            if model is None:
+                app, name = model_key.split('.', 1)
+                model = self._models[model_key] = Tortoise.apps[app][name]
+            to_python = model._meta.pk.to_python_value
+            batches[(model, field)] = {
+                to_python(pk.decode() if isinstance(pk, bytes) else pk): int(delta)
+                for pk, delta in deltas.items() if int(delta)
+            }
+        return batches
+
+    async def _write(self, model, fields: dict):
+        meta = model._meta
+        db = model._choose_db(True)
+        table = Table(meta.db_table)
+        pk_column = table[meta.db_pk_column]
+        to_db = meta.pk.to_db_value
+        pks = list(dict.fromkeys(pk for deltas in fields.values() for pk in deltas))
+        for offset in range(0, len(pks), self.batch_size):
+            batch = pks[offset:offset + self.batch_size]
+            query = db.query_class.update(table)
+            for field, deltas in fields.items():
+                changed = [pk for pk in batch if deltas.get(pk)]
+                if not changed:
+                    continue
+                column = table[meta.fields_db_projection[field]]
+                case = Case()
+                for pk in changed:
+                    case = case.when(pk_column == to_db(pk, None), deltas[pk])
+                query = query.set(column, column + case.else_(0))
+            await db.execute_query(query.where(pk_column.isin([to_db(pk, None) for pk in batch])).get_sql())
+        await query_cache().invalidate(model_tag(model))
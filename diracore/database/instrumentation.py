@@ -0,0 +1,150 @@
+from collections import Counter
+from contextvars import ContextVar
+from contextlib import contextmanager
+from diracore.support.deadline import DeadlineExceeded, remaining
+
+import asyncio
+import logging
+import re
+import time
+
+logger = logging.getLogger('diracore.database')
+
+_current_scope: ContextVar['QueryScope'] = ContextVar('db_query_scope', default=None)
+# Set while a statement is being timed, so nested client calls and EXPLAIN are not counted twice
+_suppressed: ContextVar[bool] = ContextVar('db_instrumentation_suppressed', default=False)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def query_shape(sql: str) -> str:
+    """SQL with literals stripped, so repeated lookups compare equal."""
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryScope:
+    """Queries issued while handling one HTTP request or queue job."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.time_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.repeated: set = set()
+
+    def record(self, sql: str, elapsed_ms: float):
+        self.count += 1
+        self.time_ms += elapsed_ms
+        shape = query_shape(sql)
+        self.shapes[shape] += 1
+        threshold = QueryInstrumentation.n_plus_one_threshold
+        if threshold and self.shapes[shape] >= threshold and shape not in self.repeated:
+            self.repeated.add(shape)
+            logger.warning(
+                f"Possible N+1 in [{self.name}]: query repeated {self.shapes[shape]} times: {shape}")
+
+
+@contextmanager
+def query_scope(name: str):
+    scope = QueryScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> QueryScope | None:
+    return _current_scope.get()
+
+
+class QueryInstrumentation:
+    enabled: bool = True
+    slow_query_ms: float = 500
+    explain: bool = False
+    n_plus_one_threshold: int = 10
+    debug_headers: bool = False
+
+    @classmethod
+    def configure(cls, **settings):
+        for key, value in settings.items():
+            if hasattr(cls, key):
+                setattr(cls, key, value)
+
+    @classmethod
+    async def run(cls, client, method, query: str, *args):
+        if not cls.enabled or _suppressed.get():
+            return await bounded(method(query, *args))
+        token = _suppressed.set(True)
+        started = time.perf_counter()
+        try:
+            return await bounded(method(query, *args))
+        finally:
+            _suppressed.reset(token)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            scope = _current_scope.get()
+            if scope is not None:
+                scope.record(query, elapsed_ms)
+            if cls.slow_query_ms is not None and elapsed_ms >= cls.slow_query_ms:
+                await cls.log_slow_query(client, query, args, elapsed_ms, scope)
+
+    @classmethod
+    async def log_slow_query(cls, client, query: str, args: tuple, elapsed_ms: float, scope: QueryScope):
+        origin = scope.name if scope else 'unknown'
+        message = f"Slow query ({elapsed_ms:.1f} ms) on [{client.connection_name}] from [{origin}]: {query}"
+        if cls.explain and query.lstrip()[:6].upper() == 'SELECT':
+            plan = await cls.capture_plan(client, query, args[0] if args else None)
+            if plan:
+                message += "\n" + plan
+        logger.warning(message)
+
+    @classmethod
+    async def capture_plan(cls, client, query: str, values) -> str | None:
+        token = _suppressed.set(True)
+        try:
+            rows = await client.execute_query_dict(f"EXPLAIN {query}", values)
+        except Exception as e:
+            logger.debug(f"EXPLAIN failed: {e}")
+            return None
+        finally:
+            _suppressed.reset(token)
+        return "\n".join(" ".join(str(value) for value in row.values()) for row in rows)
+
+
+async def bounded(statement):
+    """Await `statement` within the current request deadline, cancelling it server-side when it passes."""
+    timeout = remaining()
+    if timeout is None:
+        return await statement
+    if timeout <= 0:
+        statement.close()
+        raise DeadlineExceeded("Request deadline exceeded before the query was sent.")
+    try:
+        return await asyncio.wait_for(statement, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Query cancelled, request deadline exceeded.") from None
+
+
+class InstrumentedClientMixin:
+    """Times every statement a Tortoise client executes."""
+
+    async def execute_insert(self, query: str, values: list):
+        return await QueryInstrumentation.run(self, super().execute_insert, query, values)
+
+    async def execute_many(self, query: str, values: list):
+        return await QueryInstrumentation.run(self, super().execute_many, query, values)
+
+    async def execute_query(self, query: str, values: list = None):
+        return await QueryInstrumentation.run(self, super().execute_query, query, values)
+
+    async def execute_query_dict(self, query: str, values: list = None):
+        return await QueryInstrumentation.run(self, super().execute_query_dict, query, values)
+
+    async def execute_script(self, query: str):
+        return await QueryInstrumentation.run(self, super().execute_script, query)
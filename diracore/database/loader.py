@@ -0,0 +1,68 @@
+import asyncio
+
+
+class ModelLoader:
+    """Collects the pk lookups of one model issued in the same loop tick.
+
+    Every `load()` returns a future; the first one schedules a dispatch at
+    the end of the current tick, which resolves all of them with one
+    `WHERE pk IN (...)` query. Loaders are per identity map and connection
+    (a transaction has its own), so only lookups of the same request or job
+    share a query and its instances; without an identity map nothing is batched.
+    """
+
+    enabled: bool = True
+    max_batch: int = 1000
+
+    _loaders: dict[tuple, 'ModelLoader'] = {}
+
+    def __init__(self, model, db) -> None:
+        self.model = model
+        self.db = db
+        self._loop = asyncio.get_running_loop()
+        self._pending: dict = {}
+
+    @classmethod
+    def for_scope(cls, identities, model, db) -> 'ModelLoader':
+        key = (identities, model, db)
+        loader = cls._loaders.get(key)
+        if loader is None:
+            loader = cls._loaders[key] = cls(model, db)
+            loader._loop.call_soon(loader._dispatch, key)
+        return loader
+
+    def load(self, pk) -> asyncio.Future:
+        future = self._loop.create_future()
+        self._pending.setdefault(pk, []).append(future)
+        return future
+
+    def _dispatch(self, key: tuple):
+        self._loaders.pop(key, None)
+        self._loop.create_task(self._fetch(self._pending))
+
+    async def _fetch(self, pending: dict):
+        pks = list(pending)
+        instances = {}
+        try:
+            for offset in range(0, len(pks), self.max_batch):
+                batch = pks[offset:offset + self.max_batch]
+                for instance in await self.model.filter(pk__in=batch).using_db(self.db):
+                    instances[instance.pk] = instance
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        to_python = self.model._meta.pk.to_python_value
+        for pk, futures in pending.items():
+            instance = instances.get(pk)
+            if instance is None:
+                try:
+                    instance = instances.get(to_python(pk))
+                except (TypeError, ValueError):
+                    pass
+            for future in futures:
+                if not future.done():
+                    future.set_result(instance)
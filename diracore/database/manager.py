@@ -1,8 +1,17 @@
 from diracore.contracts.foundation.application import Application
-from tortoise import Tortoise
+from tortoise import Tortoise, connections
 from tortoise.contrib.fastapi import register_tortoise
 from diracore.contracts.kernel import Kernel
 from diracore.foundation.http.http_kernel import HttpKernel
+from diracore.database.router import ReadWriteRouter, stick_to_primary, sticky_scope
+from diracore.database.instrumentation import query_scope
+from diracore.database.identity import identity_map
+from diracore.database.counters import install_counter_caches
+from diracore.database.search import install_search_indexes
+from diracore.support.config.database import DatabaseConfig
+
+from contextlib import asynccontextmanager, nullcontext
+import asyncio
 
 class InvalidArgumentException(Exception):
     pass
@@ -18,30 +27,28 @@ class DatabaseManager():
         self._app = app
         self._reconnector = lambda connection: self.reconnect(connection.get_name_with_read_write_type())
 
-    def reconnect(self, name: str = None):
-        # TODO: disconnect
-        if not name in self._connections:
-            return self.connection(name)
-        return self.refresh_connections(name)
-    
-    def refresh_connections(self, name: str = None):
-        database, type = self._parse_connection_name(name)
-        self._connections[name] = self.configure(
-            self.make_connection(database), self.get_db_name(name))
-        return self._connections[name]
-    
+    async def reconnect(self, name: str = None):
+        if not self._connections:
+            return await self.connection(name)
+        return await self.refresh_connections(name)
+
+    async def refresh_connections(self, name: str = None):
+        await Tortoise.close_connections()
+        self._connections = {}
+        return await self.connection(name)
+
     @staticmethod
     def get_db_name(name):
         match name:
             case 'pgsql': return 'postgres'
         return name
-    
+
     def make_connection(self, name):
         config = self.configuration(name)
         if name in self._extensions:
             return self._extensions[name](config, name)
         return config
-        
+
     def configuration(self, name):
         name = name or self.get_default_connection()
         config: dict = self._app.make('config')
@@ -53,39 +60,100 @@ class DatabaseManager():
 
     async def connection(self, name: str = None):
         database, type = self._parse_connection_name(name)
-        name = name or database
-        if not name in self._connections:
-            self._connections[name] = await self.configure(
-                self.make_connection(database), self.get_db_name(name))
-        return self._connections[name]
-    
-    async def configure(self, connecton: dict, db_type: str):
-        if (db_type == "sqlite"):
-            db_url=db_type+'://{url}'.format(**connecton),
-            modules={'models': self._models},
-        else:
-            db_url=db_type+'://{username}:{password}@{host}:{port}/{database}'.format(**connecton),
-            modules={'models': self._models},
-        
-        obj = await Tortoise.init(
-            db_url=db_url[0],
-            modules=modules[0]
-        )
+        self.configuration(database)
+        if not self._connections:
+            await self.configure()
+        if type == 'read' and ReadWriteRouter.replicas.get(database):
+            return connections.get(ReadWriteRouter.choose_replica(database))
+        return self._connections[database]
+
+    async def configure(self):
+        """
+        Initialise Tortoise once with every configured connection and app.
+        """
+        database_config = self.database_config()
+        database_config.connections = {
+            name: self.make_connection(name) for name in database_config.connections
+        }
+        config = database_config.tortoise_config(self._models)
+        for name in database_config.connections:
+            self.configure_replicas(database_config, name)
+
+        await Tortoise.init(config=config)
+        install_counter_caches(Tortoise.apps)
+        await install_search_indexes(Tortoise.apps)
         kernel = self._app.make(Kernel)
         if isinstance(kernel, HttpKernel):
-            register_tortoise(kernel.server, db_url=db_url, modules=modules)
-        
+            register_tortoise(kernel.server, config=config)
+
         # await Tortoise.generate_schemas()
-        return Tortoise.get_connection('default')
-    
+        self._connections = {name: connections.get(name) for name in config["connections"]}
+        return self._connections
+
+    async def connect(self):
+        """
+        Open every configured connection (and its pool) concurrently.
+        """
+        if not self._connections:
+            await self.configure()
+        await asyncio.gather(*(
+            connection.create_connection(with_db=True) for connection in self._connections.values()
+        ))
+
+    def configure_replicas(self, database_config: DatabaseConfig, name: str) -> list:
+        replicas = list(database_config.get_replicas(name))
+        if replicas:
+            config = database_config.connections[name]
+            ReadWriteRouter.register(
+                name, replicas,
+                strategy=config.get('read_strategy') or 'round_robin',
+                sticky=config.get('sticky', True)
+            )
+        else:
+            ReadWriteRouter.forget(name)
+        return replicas
+
+    def database_config(self) -> DatabaseConfig:
+        config = self._app.make('config').get('database', {})
+        if isinstance(config, DatabaseConfig):
+            config = config.model_dump()
+        return DatabaseConfig.model_construct(**config)
+
+    def pool_stats(self, name: str = None) -> dict:
+        """Pool statistics of a configured connection and its read replicas."""
+        name = name or self.get_default_connection()
+        stats = {}
+        for connection in connections.all():
+            connection_name = connection.connection_name
+            if connection_name != name and not connection_name.startswith(f"{name}::"):
+                continue
+            if hasattr(connection, 'get_pool_stats'):
+                stats[connection_name] = connection.get_pool_stats()
+        return stats
+
     def transaction(self, name: str = None):
-        name = name or "default"
-        return Tortoise.get_connection(name)._in_transaction()
+        name = name or self.get_default_connection()
+        # Reads inside the transaction must see it, so they stay on the primary
+        stick_to_primary()
+        return connections.get(name)._in_transaction()
+
+    @asynccontextmanager
+    async def scope(self, name: str, identity: bool = None):
+        """Unit of work for one request or job; queries inside it are counted together.
+
+        With `identity` (default `database.identity_map`) pk lookups reuse the
+        instances already loaded in the scope. Reads stick to the primary
+        after a write only until the scope ends.
+        """
+        if identity is None:
+            identity = self._app.make('config').get('database', {}).get('identity_map', False)
+        with query_scope(name) as scope, sticky_scope(), (identity_map() if identity else nullcontext()):
+            yield scope
 
     def _parse_connection_name(self, name: str):
         name = name or self.get_default_connection()
         return name.split('::', 1) if any(name.endswith(ending) for ending in ['::read', '::write']) else [name, None]
-    
+
     def get_default_connection(self) -> str:
         config: dict = self._app.make('config')
         return config.get('database', {}).get('default', '')
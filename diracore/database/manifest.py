@@ -0,0 +1,127 @@
+import importlib
+import inspect
+import json
+import os
+
+
+class ModelManifest:
+    """Cached list of model modules handed to `Tortoise.init`.
+
+    Without a manifest every boot lists the model directories and Tortoise
+    imports every module it is given. The manifest keeps only the modules
+    that actually define models, together with their relations graph, and
+    stays valid while the mtimes of the directories and modules it lists
+    are unchanged. Adding, removing or editing a model file invalidates it.
+    Model packages (directories with an `__init__.py`) are listed like
+    modules and cover every file inside them.
+    """
+
+    def __init__(self, path: str = "bootstrap/cache/models.json") -> None:
+        self.path = path
+
+    @staticmethod
+    def scan(directories: list) -> list:
+        modules = []
+        for directory in directories:
+            try:
+                filenames = sorted(os.listdir(directory))
+            except FileNotFoundError:
+                print(f"Directory {directory} not found for models")
+                continue
+            package = directory.strip('/').replace('/', '.')
+            for filename in filenames:
+                module, extension = os.path.splitext(filename)
+                if extension == '.py' and module != '__init__':
+                    modules.append(f"{package}.{module}")
+                elif os.path.isfile(os.path.join(directory, filename, '__init__.py')):
+                    modules.append(f"{package}.{filename}")
+        return modules
+
+    def modules(self, directories: list) -> list:
+        manifest = self.load(directories)
+        if manifest is None:
+            return self.scan(directories)
+        return list(manifest["modules"])
+
+    def load(self, directories: list) -> dict | None:
+        try:
+            with open(self.path) as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("directories") != self.mtimes(directories):
+            return None
+        for path, mtime in manifest.get("files", {}).items():
+            if self.mtime(path) != mtime:
+                return None
+        return manifest
+
+    def build(self, directories: list, apps: dict = None) -> dict:
+        from tortoise.models import Model
+
+        modules, files = [], {}
+        for module_name in self.scan(directories):
+            module = importlib.import_module(module_name)
+            path = inspect.getfile(module)
+            for file in self.package_files(os.path.dirname(path)) if hasattr(module, '__path__') else [path]:
+                files[file] = self.mtime(file)
+            if any(
+                isinstance(member, type) and issubclass(member, Model) and not member._meta.abstract
+                and (member.__module__ == module_name or member.__module__.startswith(f"{module_name}."))
+                for member in vars(module).values()
+            ):
+                modules.append(module_name)
+
+        return {
+            "directories": self.mtimes(directories),
+            "files": files,
+            "modules": modules,
+            "relations": self.relations(apps or {}),
+        }
+
+    @staticmethod
+    def relations(apps: dict) -> dict:
+        graph = {}
+        for app_name, models in apps.items():
+            for model_name, model in models.items():
+                meta = model._meta
+                relations = {}
+                for kind, fields in (("fk", meta.fk_fields), ("o2o", meta.o2o_fields), ("m2m", meta.m2m_fields)):
+                    for field in fields:
+                        related = meta.fields_map[field].related_model
+                        relations[field] = {"type": kind, "model": f"{related._meta.app}.{related.__name__}"}
+                graph[f"{app_name}.{model_name}"] = {
+                    "module": model.__module__,
+                    "table": meta.db_table,
+                    "relations": relations,
+                }
+        return graph
+
+    @staticmethod
+    def package_files(directory: str) -> list:
+        return sorted(
+            os.path.join(root, filename)
+            for root, _, filenames in os.walk(directory) for filename in filenames if filename.endswith('.py')
+        )
+
+    def write(self, manifest: dict):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+    def clear(self) -> bool:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def mtimes(self, directories: list) -> dict:
+        return {directory: self.mtime(directory) for directory in directories}
+
+    @staticmethod
+    def mtime(path: str) -> float | None:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
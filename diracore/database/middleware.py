@@ -0,0 +1,26 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+from diracore.database.instrumentation import QueryInstrumentation
+
+
+class QueryScopeMiddleware:
+    """Collects the queries of each request into one `QueryScope`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        from diracore.main import app
+        db = app.make('db') if scope["type"] == "http" else None
+        if db is None:
+            return await self.app(scope, receive, send)
+
+        async with db.scope(f"{scope['method']} {scope['path']}") as query_scope:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start" and QueryInstrumentation.debug_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Query-Count", str(query_scope.count))
+                    headers.append("X-DB-Query-Time", f"{query_scope.time_ms:.2f}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
@@ -14,8 +14,79 @@ from tortoise.queryset import (
     QuerySet,
     QuerySetSingle,
 )
+from tortoise.signals import Signals
+from diracore.database import bulk
+from diracore.database.compiled import CompiledQuery
+from diracore.database.cache import model_tag
+from diracore.database.identity import current_identity_map, forget_identity
+from diracore.database.queryset import QuerySet, query_cache
+from diracore.database.increments import IncrementBuffer
+from functools import lru_cache, partial
 import inflect
 
+
+@lru_cache(maxsize=1)
+def inflector() -> inflect.engine:
+    # Building an inflect engine is expensive, one per process is enough
+    return inflect.engine()
+
+
+@lru_cache(maxsize=None)
+def queryset_methods(queryset_class: type) -> frozenset:
+    return frozenset(
+        name for name in dir(queryset_class)
+        if not name.startswith('_') and callable(getattr(queryset_class, name, None))
+    )
+
+
+def forward_to_queryset(model, name: str, *args, **kwargs):
+    return getattr(model._meta.manager.get_queryset(), name)(*args, **kwargs)
+
+
+def increment_buffer() -> IncrementBuffer:
+    from diracore.main import app
+    buffer = app.make('db.increments')
+    if buffer is None:
+        # No database provider registered, buffer in process
+        app.singleton('db.increments', lambda: IncrementBuffer())
+        buffer = app.make('db.increments')
+    return buffer
+
+
+async def invalidate_model_cache(sender, *args, **kwargs):
+    await query_cache().invalidate(model_tag(sender))
+
+
+_tracked_fields: dict[type, tuple] = {}
+
+
+def tracked_fields(model) -> tuple:
+    fields = _tracked_fields.get(model)
+    if fields is None:
+        meta = model._meta
+        fields = tuple(name for name in meta.fields_db_projection if name != meta.pk_attr)
+        if meta._inited:
+            _tracked_fields[model] = fields
+    return fields
+
+
+def snapshot(value):
+    """Copy of the dicts and lists of a JSON value, much cheaper than deepcopy."""
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [snapshot(item) for item in value]
+    return value
+
+
+async def forget_model(model):
+    """After writes that bypass instances: drop cached results and loaded identities."""
+    identities = current_identity_map()
+    if identities is not None:
+        identities.forget(model)
+    await invalidate_model_cache(model)
+
+
 class Manager(BaseManager):
     def __init__(self, model=None, query_set_class=QuerySet) -> None:
         self.query_set = query_set_class
@@ -31,13 +102,25 @@ class ModelMeta(BaseModelMeta):
         new_class = super().__new__(mcs, name, bases, attrs)
         if 'QuerySet' in attrs:
             new_class._meta.manager = Manager(new_class, attrs['QuerySet'])
+        elif 'manager' not in attrs and not hasattr(attrs.get('Meta'), 'manager'):
+            # Keep a manager declared through `class Meta: manager = ...`
+            new_class._meta.manager = Manager(new_class)
         if not new_class._meta.db_table:
             new_class._meta.db_table = mcs.to_snake_plural_last(new_class.__name__)
+        for signal in (Signals.post_save, Signals.post_delete):
+            new_class.register_listener(signal, invalidate_model_cache)
+            new_class.register_listener(signal, forget_identity)
+        queryset_class = vars(new_class._meta.manager).get('query_set', QuerySet)
+        new_class._queryset_forwarders = {
+            method: partial(forward_to_queryset, new_class, method) for method in queryset_methods(queryset_class)
+        }
+        new_class._prepare_class()
         return new_class
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def to_snake_plural_last(input_str):
-        p = inflect.engine()
+        p = inflector()
         words = []
         current_word = input_str[0].lower()
 
@@ -58,14 +141,163 @@ class ModelMeta(BaseModelMeta):
     def __getitem__(cls: Type[MODEL], key: Any) -> QuerySetSingle[MODEL]:  # type: ignore
         return cls._getbypk(key)  # type: ignore
     
-    def __getattr__(self, __name):
-        if hasattr(self._meta.manager.get_queryset(), __name):
-            return getattr(self._meta.manager.get_queryset(), __name)
+    def __getattr__(cls, name):
+        forwarders = cls.__dict__.get('_queryset_forwarders')
+        if forwarders is not None and name in forwarders:
+            return forwarders[name]
+        if name.startswith('_'):
+            raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'")
+        try:
+            return getattr(cls._meta.manager.get_queryset(), name)
+        except AttributeError:
+            raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'") from None
 
 class Model(BaseModel, metaclass=ModelMeta):
+    # Columns never exposed through `?fields=` or `sparse()`
+    hidden: tuple = ()
+
+    @classmethod
+    def _prepare_class(cls):
+        """Called once the class is built; mixins hook their listeners here."""
+
     @classmethod
     def query(cls) -> QuerySet[Self]:
         return QuerySet(cls)
+
+    @classmethod
+    def _init_from_db(cls, **kwargs) -> Self:
+        instance = super()._init_from_db(**kwargs)
+        instance.sync_original()
+        return instance
+
+    def sync_original(self):
+        """Remember the current column values as the persisted state."""
+        values = self.__dict__
+        self._original = {
+            name: snapshot(values[name]) if isinstance(values[name], (dict, list)) else values[name]
+            for name in tracked_fields(type(self)) if name in values
+        }
+
+    def get_original(self, field: str = None):
+        original = self.__dict__.get('_original', {})
+        return original if field is None else original.get(field)
+
+    def get_dirty(self) -> dict:
+        """Columns changed since the instance was loaded or last saved."""
+        original = self.__dict__.get('_original')
+        values = self.__dict__
+        if original is None:
+            return {name: values[name] for name in tracked_fields(type(self)) if name in values}
+        return {
+            name: values[name] for name in tracked_fields(type(self))
+            if name in values and (name not in original or values[name] != original[name])
+        }
+
+    def is_dirty(self, *fields: str) -> bool:
+        dirty = self.get_dirty()
+        return any(field in dirty for field in fields) if fields else bool(dirty)
+
+    async def save(self, using_db=None, update_fields=None, force_create: bool = False,
+                   force_update: bool = False) -> None:
+        """Save only the changed columns of a loaded instance; unchanged instances are not written."""
+        explicit = update_fields is not None
+        if not explicit and self._saved_in_db and not force_create and '_original' in self.__dict__:
+            dirty = list(self.get_dirty())
+            if not dirty:
+                return
+            fields_map = self._meta.fields_map
+            update_fields = dirty + [
+                name for name in tracked_fields(type(self))
+                if name not in dirty and getattr(fields_map[name], 'auto_now', False)
+            ]
+        await super().save(using_db=using_db, update_fields=update_fields,
+                           force_create=force_create, force_update=force_update)
+        if explicit and '_original' in self.__dict__:
+            # Columns the caller left out keep their pending changes
+            self._original.update({
+                name: value for name, value in self.get_dirty().items() if name in update_fields
+            })
+        else:
+            self.sync_original()
+
+    async def refresh_from_db(self, fields=None, using_db=None) -> None:
+        await super().refresh_from_db(fields=fields, using_db=using_db)
+        self.sync_original()
+
+    @classmethod
+    async def load(cls, pk) -> Self | None:
+        """Fetch by pk; inside an identity-map scope, loads of the same tick share one query."""
+        return await cls.get_or_none(pk=pk)
+
+    @classmethod
+    async def load_many(cls, pks: list) -> list[Self | None]:
+        """Instances for `pks` in order (None where missing), in one query."""
+        to_python = cls._meta.pk.to_python_value
+        found = {instance.pk: instance for instance in await cls.filter(pk__in=list(dict.fromkeys(pks)))}
+        return [found.get(to_python(pk)) for pk in pks]
+
+    @classmethod
+    async def increment_buffered(cls, pk, field: str, by: int = 1):
+        """Add `by` to `field` of row `pk` on the next flush of the increment buffer.
+
+        For hot counters (views, usage meters); the database only sees one
+        batched UPDATE per model and flush interval. Read with `read_buffered()`.
+        """
+        await increment_buffer().add(cls, pk, field, by)
+
+    @classmethod
+    async def read_buffered(cls, pk, field: str) -> int:
+        """Stored value of a buffered counter plus the increments not flushed yet."""
+        stored = await cls.filter(pk=pk).values_list(field, flat=True)
+        pending = await increment_buffer().pending(cls, pk, field)
+        return (stored[0] if stored else 0) + pending
+
+    @classmethod
+    def compile(cls, builder: callable) -> CompiledQuery:
+        """Compile `builder(*params)` once per parameter types, e.g.
+
+            by_token = User.compile(lambda token, id: User.where_actual_token(token).get_or_none(id=id))
+            user = await by_token(credentials, user_id)
+
+        Parameters must reach the query as filter values; anything computed
+        inside the builder (such as `datetime.now()`) is frozen into the SQL.
+        """
+        return CompiledQuery(cls, builder)
+
+    @classmethod
+    async def insert_many(cls, rows, fields: list = None, chunk_size: int = 1000, using_db=None) -> int:
+        """Insert dicts or tuples (ordered as `fields`) from an iterable or async iterable.
+
+        pgsql streams each chunk through COPY, other drivers use executemany.
+        """
+        inserted = await bulk.insert_many(cls, rows, fields, chunk_size, using_db)
+        await forget_model(cls)
+        return inserted
+
+    @classmethod
+    async def upsert_many(cls, rows, conflict: str | list, update: list = None, fields: list = None,
+                          chunk_size: int = 1000, using_db=None) -> int:
+        """Multi-row INSERT ... ON CONFLICT (conflict) DO UPDATE SET update.
+
+        With dict rows only the supplied keys are updated (other fields get
+        their defaults on insert alone) and every row must carry the same keys.
+        `update` defaults to those fields outside `conflict` plus the `auto_now`
+        ones; an empty list does nothing on conflict.
+        """
+        written = await bulk.upsert_many(cls, rows, conflict, update, fields, chunk_size, using_db)
+        await forget_model(cls)
+        return written
+
+    @classmethod
+    async def update_many(cls, rows, fields: list = None, key: str = None,
+                          chunk_size: int = 1000, using_db=None) -> int:
+        """Update rows matched by `key` (the pk by default), one executemany per chunk.
+
+        Dict rows must all carry the columns of the first row (or `fields`).
+        """
+        updated = await bulk.update_many(cls, rows, fields, key, chunk_size, using_db)
+        await forget_model(cls)
+        return updated
     
     @classmethod
     def from_queryset(cls, queryset_class, *args, **kwargs):
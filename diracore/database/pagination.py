@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+from pypika.terms import Criterion, Tuple
+
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class CursorPage:
+    items: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    has_more: bool = False
+    limit: int = 0
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(order: list, values: list) -> str:
+    payload = json.dumps({"o": [name for name, _ in order], "v": values}, default=_encode_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order: list) -> list:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        names, values = payload["o"], payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Malformed pagination cursor.") from None
+    if names != [name for name, _ in order] or len(values) != len(order):
+        raise InvalidCursor("Pagination cursor does not match the requested ordering.")
+    return values
+
+
+def parse_ordering(model, order_by) -> list:
+    """`("-created_at", "id")` as `[("created_at", True), ("id", False)]`, always ending on the pk.
+
+    Only non-nullable columns can be keys: `(k1, k2) > (v1, v2)` is never
+    true for NULLs, so rows with a NULL key would silently drop out of pages.
+    """
+    meta = model._meta
+    pk = meta.pk_attr
+    order = []
+    for name in ([order_by] if isinstance(order_by, str) else order_by):
+        descending = name.startswith('-')
+        name = name.lstrip('-+')
+        name = pk if name == 'pk' else name
+        if name not in meta.fields_db_projection:
+            raise ValueError(f"Cannot paginate {model.__name__} by '{name}', it is not a column.")
+        if meta.fields_map[name].null:
+            raise ValueError(f"Cannot paginate {model.__name__} by nullable '{name}'.")
+        order.append((name, descending))
+    if pk not in (name for name, _ in order):
+        order.append((pk, order[-1][1] if order else False))
+    return order
+
+
+def keyset_criterion(model, db, order: list, raw_values: list, backwards: bool) -> Criterion:
+    """`(k1, k2) > (v1, v2)`, or its expanded form when directions are mixed."""
+    meta = model._meta
+    table = meta.basetable
+    to_db = getattr(db.executor_class, '_field_to_db', None)
+    columns, values = [], []
+    for (name, _), raw in zip(order, raw_values):
+        model_field = meta.fields_map[name]
+        value = model_field.to_python_value(raw) if raw is not None else None
+        columns.append(table[meta.fields_db_projection[name]])
+        values.append(to_db(model_field, value, None) if to_db else model_field.to_db_value(value, None))
+
+    ascending = [descending == backwards for _, descending in order]
+    if all(ascending):
+        return Tuple(*columns) > Tuple(*values)
+    if not any(ascending):
+        return Tuple(*columns) < Tuple(*values)
+
+    criterion = None
+    for index, column in enumerate(columns):
+        term = column > values[index] if ascending[index] else column < values[index]
+        for previous in range(index):
+            term = (columns[previous] == values[previous]) & term
+        criterion = term if criterion is None else criterion | term
+    return criterion
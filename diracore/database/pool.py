@@ -0,0 +1,36 @@
+import bisect
+
+
+class PoolStats:
+    """Acquire-side pool metrics kept by the diracore database clients."""
+
+    # Upper bounds of the acquire wait histogram, in milliseconds
+    buckets: tuple = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+    def __init__(self) -> None:
+        self.waiters = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.histogram = [0] * len(self.buckets)
+
+    def observe(self, wait_ms: float):
+        self.acquired += 1
+        self.wait_total_ms += wait_ms
+        self.histogram[bisect.bisect_left(self.buckets, wait_ms)] += 1
+
+    def to_dict(self, pool=None) -> dict:
+        return {
+            'size': pool.get_size() if pool else 0,
+            'idle': pool.get_idle_size() if pool else 0,
+            'min_size': pool.get_min_size() if pool else None,
+            'max_size': pool.get_max_size() if pool else None,
+            'waiters': self.waiters,
+            'acquired': self.acquired,
+            'timeouts': self.timeouts,
+            'wait_avg_ms': self.wait_total_ms / self.acquired if self.acquired else 0.0,
+            'wait_histogram_ms': {
+                ('+inf' if bound == float('inf') else f"<={bound}"): count
+                for bound, count in zip(self.buckets, self.histogram)
+            },
+        }
@@ -1,45 +1,63 @@
 
 from diracore.support.service_provider import ServiceProvider
 from diracore.database.manager import DatabaseManager
-import os 
-import itertools
+from diracore.database.instrumentation import QueryInstrumentation
+from diracore.database.cache import QueryCache
+from diracore.database.increments import IncrementBuffer
+from diracore.database.loader import ModelLoader
+from diracore.main import config
+from redis.asyncio import Redis as ARedis
+from diracore.foundation.console.console_kernel import ConsoleKernel
+from diracore.foundation.http.http_kernel import HttpKernel
 
 class DatabaseServiceProvider(ServiceProvider):
     async def boot(self):
+        QueryInstrumentation.configure(**self.app.make('config').get('database', {}).get('instrumentation') or {})
+        ModelLoader.enabled = config('database.batch_lookups', True)
         db: DatabaseManager = self.app.make('db')
         db_name = self.app.make('config').get('database', {}).get('default', '')
         if db_name:
             await db.connection(db_name)
+            if isinstance(self.kernel, HttpKernel):
+                # Servers open every pool up front; console commands stay lazy
+                await db.connect()
+        increments: IncrementBuffer = self.app.make('db.increments')
+        self.app.terminating(lambda app: increments.stop())
+        if isinstance(self.kernel, HttpKernel):
+            cache: QueryCache = self.app.make('db.cache')
+            await cache.start()
+            self.app.terminating(lambda app: cache.stop())
 
     async def register(self):
         await self.register_connection_services()
         await self.register_models()
+        self.register_console()
+
+    def register_console(self):
+        if isinstance(self.kernel, ConsoleKernel):
+            self.kernel.load('diracore.database.commands')
 
     async def register_connection_services(self):
         self.app.singleton('db', DatabaseManager)
         self.app.make('db')
+        self.app.singleton('db.cache', lambda: self.query_cache())
+        self.app.singleton('db.increments', lambda: self.increment_buffer())
 
-    async def register_models(self):
-        config: dict = self.app.make("config")
-        model_directory = config.get("database", {}).get("models").get("path")
-        models = []
-        for directory in model_directory:
-            models.append(self.get_filenames(directory))
-        models = list(itertools.chain(*models))
+    def query_cache(self):
+        return QueryCache(
+            redis=self.app.make(ARedis) if config('database.cache.redis', True) else None,
+            max_entries=config('database.cache.max_entries', 1024),
+            prefix=config('database.cache.prefix', 'db:cache:'),
+            channel=config('database.cache.channel', 'db:cache:invalidate'),
+        )
 
+    def increment_buffer(self):
+        return IncrementBuffer(
+            redis=self.app.make(ARedis) if config('database.increments.redis', True) else None,
+            flush_interval=config('database.increments.flush_interval', 5),
+            prefix=config('database.increments.prefix', 'db:increments:'),
+        )
+
+    async def register_models(self):
         db: DatabaseManager = self.app.make('db')
-        db._models.extend(models)
-
-    def get_filenames(self, directory) -> list:
-        try:
-            filenames = os.listdir(directory)
-            if "__pycache__" in filenames:
-                filenames.remove("__pycache__")
-            if not directory.endswith('/'):
-                directory += "/"
-            directory = directory.replace("/", ".")
-            listmodules = [directory + filename.rstrip('.py') for filename in filenames]
-            return listmodules
-        except FileNotFoundError:
-            print(f"Directory {directory} not found for models")
-            return []
\ No newline at end of file
+        db._models.extend(db.database_config().get_models())
@@ -0,0 +1,311 @@
+from tortoise.queryset import QuerySet as BaseQuerySet
+from tortoise.models import MODEL
+from diracore.database.cache import QueryCache, CachingClient, model_tag
+from diracore.database.identity import adopt, current_identity_map
+from diracore.database.loader import ModelLoader
+from diracore.database.fieldsets import requested_fields, visible_fields
+from diracore.database.search import SearchIndex
+from diracore.database.pagination import CursorPage, decode_cursor, encode_cursor, keyset_criterion, parse_ordering
+from tortoise.exceptions import DoesNotExist, MultipleObjectsReturned
+
+from contextlib import aclosing, suppress
+from dataclasses import make_dataclass
+from functools import lru_cache
+from tortoise import fields as tortoise_fields
+import asyncio
+
+_DONE = object()
+
+
+def query_cache() -> QueryCache:
+    from diracore.main import app
+    cache = app.make('db.cache')
+    if cache is None:
+        # No database provider registered, keep a process-local cache
+        app.singleton('db.cache', lambda: QueryCache())
+        cache = app.make('db.cache')
+    return cache
+
+
+# Field types asyncpg already decodes to the same python values Tortoise would produce
+# Datetimes are left out: `to_python_value` applies the configured timezone
+NATIVE_PG_FIELDS = (
+    tortoise_fields.IntField, tortoise_fields.BigIntField, tortoise_fields.SmallIntField,
+    tortoise_fields.CharField, tortoise_fields.TextField, tortoise_fields.BooleanField,
+    tortoise_fields.FloatField, tortoise_fields.DecimalField, tortoise_fields.UUIDField,
+    tortoise_fields.DateField,
+)
+
+
+@lru_cache(maxsize=None)
+def row_plan(model, fields: tuple, dialect: str) -> tuple:
+    """Row class and the per-column conversions needed for `fields` on `dialect`."""
+    row_class = make_dataclass(f"{model.__name__}Row", fields, frozen=True, slots=True)
+    # Columns Tortoise itself hydrates without conversion on this model's driver
+    native = {name for _, name, _ in model._meta.db_native_fields}
+    converters = []
+    for index, name in enumerate(fields):
+        field = model._meta.fields_map.get(name)
+        if field is None or name in native or (dialect == "postgres" and type(field) in NATIVE_PG_FIELDS):
+            continue
+        converters.append((index, field.to_python_value))
+    return row_class, tuple(converters)
+
+
+class QuerySet(BaseQuerySet[MODEL]):
+    __slots__ = ("_cache_ttl", "_cache_tags")
+
+    def __init__(self, model) -> None:
+        super().__init__(model)
+        self._cache_ttl: float = None
+        self._cache_tags: tuple = ()
+
+    def _clone(self) -> "QuerySet":
+        queryset = super()._clone()
+        queryset._cache_ttl = self._cache_ttl
+        queryset._cache_tags = self._cache_tags
+        return queryset
+
+    def update(self, **kwargs):
+        self._forget_identities()
+        return super().update(**kwargs)
+
+    def delete(self):
+        self._forget_identities()
+        return super().delete()
+
+    def _forget_identities(self):
+        identities = current_identity_map()
+        if identities is not None:
+            identities.forget(self.model)
+
+    def _identity_pks(self) -> tuple | None:
+        """Primary keys of a plain pk / pk__in lookup, served from the identity map or a loader.
+
+        Worked out from the filters when the queryset runs inside an identity
+        map, so building querysets stays as cheap as in Tortoise.
+        """
+        if len(self._q_objects) != 1:
+            return None
+        q = self._q_objects[0]
+        if q.children or q._is_negated or len(q.filters) != 1:
+            return None
+        (key, value), = q.filters.items()
+        pk = self.model._meta.pk_attr
+        if key in ('pk', pk):
+            pks = (value,)
+        elif key in ('pk__in', f"{pk}__in") and isinstance(value, (list, tuple, set, frozenset)):
+            pks = tuple(dict.fromkeys(value))
+        else:
+            return None
+        if (self._prefetch_map or self._select_related or self._annotations
+                or self._fields_for_select or self._select_for_update or self._offset):
+            return None
+        if self._single:
+            # get()/first() only short-circuit a single pk; with several, limit and ordering decide
+            return pks if len(pks) == 1 else None
+        return pks if self._limit is None and not self._orderings else None
+
+    def cache(self, ttl: float = 60, tags: list = None) -> "QuerySet":
+        """Serve the result rows from the query cache for `ttl` seconds.
+
+        Entries are always tagged with the model, which is invalidated when
+        one of its instances is saved or deleted.
+        """
+        queryset = self._clone()
+        queryset._cache_ttl = ttl
+        queryset._cache_tags = (model_tag(self.model), *(tags or ()))
+        return queryset
+
+    async def _execute(self):
+        identities = current_identity_map()
+        pks = self._identity_pks() if identities is not None else None
+        if pks is None:
+            return adopt(await self._load())
+
+        found = {pk: identities.get(self.model, pk) for pk in pks}
+        missing = [pk for pk, instance in found.items() if instance is None]
+        if (missing and self._single and len(pks) == 1 and not self._orderings
+                and getattr(self, '_cache_ttl', None) is None and ModelLoader.enabled):
+            # Single pk lookups (get, get_or_none, foreign keys) of one tick in this scope share a query
+            found[missing[0]] = adopt(await ModelLoader.for_scope(identities, self.model, self._db).load(missing[0]))
+        elif len(missing) == len(found):
+            return adopt(await self._load())
+        elif missing:
+            for instance in adopt(await self.filter(pk__in=missing)):
+                found[instance.pk] = instance
+
+        instances = [instance for instance in found.values() if instance is not None]
+        if not self._single:
+            return instances
+        if len(instances) == 1:
+            return instances[0]
+        if not instances:
+            if self._raise_does_not_exist:
+                raise DoesNotExist("Object does not exist")
+            return None
+        raise MultipleObjectsReturned("Multiple objects returned, expected exactly one")
+
+    async def _load(self):
+        if getattr(self, '_cache_ttl', None) is None:
+            return await super()._execute()
+        db = self._db
+        self._db = CachingClient(db, query_cache(), self._cache_ttl, self._cache_tags)
+        try:
+            return await super()._execute()
+        finally:
+            self._db = db
+
+    def search(self, text: str) -> "QuerySet":
+        """Rows of a `Searchable` model matching `text`, most relevant first (as `search_rank`)."""
+        index = SearchIndex.of(self.model)
+        db = self._db or self.model._choose_db()
+        dialect = index.dialect(db)
+        return self.filter(pk__in=index.match(dialect, text)).annotate(
+            search_rank=index.rank(dialect, text)
+        ).order_by('-search_rank', self.model._meta.pk_attr)
+
+    def sparse(self, *default: str):
+        """`.values()` of the fields requested with `?fields=`, else `default` or every visible field."""
+        return self.values(*(requested_fields() or default or visible_fields(self.model)))
+
+    async def rows(self, *fields: str) -> list:
+        """Fetch `fields` (default: every column) as frozen, slotted row objects.
+
+        No model instances are built and columns the driver already decodes
+        are not converted again. Rows serialize directly with orjson.
+        """
+        return await self._rows(fields or tuple(self.model._meta.fields_db_projection))
+
+    async def _rows(self, fields: tuple, criterion=None) -> list:
+        query = self.values_list(*fields)
+        if query._db is None:
+            query._db = query._choose_db()
+        query._make_query()
+        if criterion is not None:
+            query.query = query.query.where(criterion)
+        db = query._db
+        if getattr(self, '_cache_ttl', None) is not None:
+            db = CachingClient(db, query_cache(), self._cache_ttl, self._cache_tags)
+        _, records = await db.execute_query(query.query.get_sql())
+
+        row_class, converters = row_plan(self.model, tuple(fields), db.capabilities.dialect)
+        if not converters:
+            return [row_class(*(record.values() if isinstance(record, dict) else record)) for record in records]
+        rows = []
+        for record in records:
+            values = list(record.values() if isinstance(record, dict) else record)
+            for index, convert in converters:
+                values[index] = convert(values[index])
+            rows.append(row_class(*values))
+        return rows
+
+    async def paginate_cursor(self, order_by: str | tuple = 'pk', limit: int = 20, after: str = None,
+                              before: str = None, fields: tuple = None) -> CursorPage:
+        """Keyset pagination: `WHERE (k1, k2) > (...) ORDER BY k1, k2 LIMIT n`.
+
+        The pk is appended to `order_by` as a tie-breaker; nullable columns
+        are rejected with a ValueError. Pass the page's
+        `next_cursor` as `after` or its `prev_cursor` as `before`. With
+        `fields` the items are `rows()` objects and the page serializes directly.
+        """
+        order = parse_ordering(self.model, order_by)
+        backwards = before is not None
+        cursor = before if backwards else after
+        queryset = self.order_by(*(
+            ('-' if descending != backwards else '') + name for name, descending in order
+        )).limit(limit + 1)
+        if queryset._db is None:
+            queryset._db = queryset._choose_db()
+        criterion = keyset_criterion(
+            self.model, queryset._db, order, decode_cursor(cursor, order), backwards
+        ) if cursor else None
+
+        if fields:
+            fields = (*fields, *(name for name, _ in order if name not in fields))
+            items = await queryset._rows(fields, criterion)
+        else:
+            queryset._make_query()
+            if criterion is not None:
+                queryset.query = queryset.query.where(criterion)
+            items = await queryset._execute()
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backwards:
+            items.reverse()
+        key = lambda item: [getattr(item, name) for name, _ in order]
+        page = CursorPage(items=items, has_more=has_more, limit=limit)
+        if items:
+            if backwards or has_more:
+                page.next_cursor = encode_cursor(order, key(items[-1]))
+            if after or (backwards and has_more):
+                page.prev_cursor = encode_cursor(order, key(items[0]))
+        return page
+
+    async def chunk(self, size: int = 1000, keyset: bool = None):
+        """Yield the results in lists of at most `size` instances.
+
+        pgsql reads through a server-side cursor inside a transaction, other
+        drivers (or `keyset=True`) page by primary key, in which case the
+        queryset's own ordering and limit are ignored. The next chunk is
+        fetched while the caller processes the current one.
+        """
+        if self._prefetch_map or self._select_related:
+            raise ValueError("chunk() and cursor() do not support prefetch_related or select_related.")
+        queryset = self._clone()
+        queryset._cache_ttl = None
+        if queryset._db is None:
+            queryset._db = queryset._choose_db()
+        if keyset is None:
+            keyset = not getattr(getattr(queryset._db, 'connection_class', None), '__module__', '').startswith('asyncpg')
+
+        queue = asyncio.Queue(maxsize=1)
+        pages = queryset._keyset_pages(size) if keyset else queryset._cursor_pages(size)
+        producer = asyncio.get_running_loop().create_task(self._feed(queue, pages))
+        try:
+            while (rows := await queue.get()) is not _DONE:
+                yield rows
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await producer
+
+    async def cursor(self, prefetch: int = 1000, keyset: bool = None):
+        async for rows in self.chunk(prefetch, keyset):
+            for instance in rows:
+                yield instance
+
+    @staticmethod
+    async def _feed(queue: asyncio.Queue, pages):
+        async with aclosing(pages):
+            try:
+                async for rows in pages:
+                    await queue.put(rows)
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                await queue.put(_DONE)
+                raise
+        await queue.put(_DONE)
+
+    async def _cursor_pages(self, size: int):
+        sql = self.sql()
+        async with self._db._in_transaction() as connection:
+            cursor = await connection._connection.cursor(sql)
+            while records := await cursor.fetch(size):
+                yield [self.model._init_from_db(**record) for record in records]
+                if len(records) < size:
+                    break
+
+    async def _keyset_pages(self, size: int):
+        pk = self.model._meta.pk_attr
+        page = self.order_by(pk).limit(size)
+        rows = await page
+        while rows:
+            yield rows
+            if len(rows) < size:
+                break
+            rows = await page.filter(**{f"{pk}__gt": getattr(rows[-1], pk)})
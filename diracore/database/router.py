@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from tortoise import connections
+
+import itertools
+
+_stick_to_primary: ContextVar[bool] = ContextVar('db_stick_to_primary', default=False)
+
+
+def stick_to_primary():
+    """Send the remaining reads of the current request or job to the primary."""
+    _stick_to_primary.set(True)
+
+
+def is_sticky() -> bool:
+    return _stick_to_primary.get()
+
+
+@contextmanager
+def sticky_scope():
+    """Reads start on the replicas again and stop sticking once the scope ends."""
+    token = _stick_to_primary.set(False)
+    try:
+        yield
+    finally:
+        _stick_to_primary.reset(token)
+
+
+class ReadWriteRouter:
+    """Tortoise connection router that spreads reads over read replicas.
+
+    Writes always go to the model's own (primary) connection. After the
+    first write in a request or job the remaining reads stick to the primary
+    as well, so the caller reads its own writes despite replica lag.
+    """
+    replicas: dict[str, list[str]] = {}
+    strategies: dict[str, str] = {}
+    sticky: dict[str, bool] = {}
+    _cursors: dict[str, itertools.count] = {}
+
+    @classmethod
+    def register(cls, primary: str, replicas: list, strategy: str = 'round_robin', sticky: bool = True):
+        cls.replicas[primary] = list(replicas)
+        cls.strategies[primary] = strategy
+        cls.sticky[primary] = sticky
+        cls._cursors[primary] = itertools.count()
+
+    @classmethod
+    def forget(cls, primary: str):
+        for registry in (cls.replicas, cls.strategies, cls.sticky, cls._cursors):
+            registry.pop(primary, None)
+
+    def db_for_read(self, model):
+        primary = model._meta.default_connection
+        if is_sticky() or not self.replicas.get(primary):
+            return None
+        return self.choose_replica(primary)
+
+    def db_for_write(self, model):
+        if self.sticky.get(model._meta.default_connection, True):
+            stick_to_primary()
+        return None
+
+    @classmethod
+    def choose_replica(cls, primary: str) -> str:
+        replicas = cls.replicas[primary]
+        if cls.strategies.get(primary) == 'least_outstanding':
+            return min(replicas, key=cls.outstanding)
+        return replicas[next(cls._cursors[primary]) % len(replicas)]
+
+    @staticmethod
+    def outstanding(name: str) -> int:
+        # Connections checked out of the pool are queries still in flight
+        pool = getattr(connections.get(name), '_pool', None)
+        if pool is None:
+            return 0
+        return pool.get_size() - pool.get_idle_size()
@@ -0,0 +1,197 @@
+from pypika.terms import ValueWrapper
+from tortoise.expressions import RawSQL
+from tortoise.signals import Signals
+
+import logging
+
+# pgsql weight classes, assigned to `searchable` fields in declaration order
+WEIGHTS = ('A', 'B', 'C', 'D')
+
+
+class SearchIndex:
+    """Shadow table holding the search document of every row of a `Searchable` model.
+
+    pgsql keeps a weighted tsvector per row behind a GIN index, sqlite an
+    FTS5 virtual table keyed by rowid (integer primary keys only). Lookups
+    hit the index and join back by primary key, so they do not scan the model table.
+    """
+
+    _indexes: dict[type, 'SearchIndex'] = {}
+
+    def __init__(self, model) -> None:
+        meta = model._meta
+        self.model = model
+        self.fields = tuple(model.searchable)
+        self.language = model.search_language
+        self.table = f"{meta.db_table}_search"
+        self.source_table = meta.db_table
+        self.pk_column = meta.db_pk_column
+
+    @classmethod
+    def of(cls, model) -> 'SearchIndex':
+        index = cls._indexes.get(model)
+        if index is None:
+            if not getattr(model, 'searchable', None):
+                raise TypeError(f"{model.__name__} has no searchable fields; use the Searchable mixin.")
+            index = cls._indexes[model] = cls(model)
+        return index
+
+    @staticmethod
+    def dialect(db) -> str:
+        dialect = db.capabilities.dialect
+        if dialect not in ("postgres", "sqlite"):
+            raise NotImplementedError(f"Full-text search is not supported on {dialect}.")
+        return dialect
+
+    def literal(self, value: str) -> str:
+        return ValueWrapper(value).get_sql()
+
+    def document(self, instance) -> list:
+        values = (getattr(instance, name, None) for name in self.fields)
+        return ['' if value is None else str(value) for value in values]
+
+    def schema(self, dialect: str) -> list:
+        if dialect == "postgres":
+            pk_type = self.model._meta.pk.get_for_dialect(dialect, "SQL_TYPE")
+            return [
+                f'CREATE TABLE IF NOT EXISTS "{self.table}" ('
+                f'"id" {pk_type} PRIMARY KEY REFERENCES "{self.source_table}" ("{self.pk_column}") ON DELETE CASCADE, '
+                f'"document" TSVECTOR NOT NULL)',
+                f'CREATE INDEX IF NOT EXISTS "{self.table}_document_idx" ON "{self.table}" USING GIN ("document")',
+            ]
+        columns = ', '.join(f'"{name}"' for name in self.fields)
+        return [
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS "{self.table}" USING fts5({columns}, tokenize=\'unicode61 remove_diacritics 2\')',
+        ]
+
+    async def ensure(self, db):
+        for statement in self.schema(self.dialect(db)):
+            await db.execute_script(statement)
+
+    async def drop(self, db):
+        await db.execute_script(f'DROP TABLE IF EXISTS "{self.table}"')
+
+    async def index(self, instances: list, db=None):
+        db = db or self.model._choose_db(True)
+        rows = [(instance.pk, *self.document(instance)) for instance in instances]
+        if not rows:
+            return
+        if self.dialect(db) == "postgres":
+            language = self.literal(self.language)
+            vector = ' || '.join(
+                f"setweight(to_tsvector({language}, ${number}), '{WEIGHTS[min(number - 2, 3)]}')"
+                for number in range(2, len(self.fields) + 2)
+            )
+            await db.execute_many(
+                f'INSERT INTO "{self.table}" ("id", "document") VALUES ($1, {vector}) '
+                f'ON CONFLICT ("id") DO UPDATE SET "document" = EXCLUDED."document"', rows)
+        else:
+            await self.remove([row[0] for row in rows], db)
+            columns = ', '.join(f'"{name}"' for name in self.fields)
+            placeholders = ', '.join('?' for _ in range(len(self.fields) + 1))
+            await db.execute_many(f'INSERT INTO "{self.table}" (rowid, {columns}) VALUES ({placeholders})', rows)
+
+    async def remove(self, pks: list, db=None):
+        db = db or self.model._choose_db(True)
+        key = '"id"' if self.dialect(db) == "postgres" else 'rowid'
+        placeholder = '$1' if self.dialect(db) == "postgres" else '?'
+        await db.execute_many(f'DELETE FROM "{self.table}" WHERE {key} = {placeholder}', [(pk,) for pk in pks])
+
+    async def rebuild(self, chunk_size: int = 1000, db=None) -> int:
+        """Re-index every row of the model table without emptying the index first.
+
+        pgsql upserts the documents into the live index, so indexed rows stay
+        searchable throughout and rows deleted meanwhile cascade out of it.
+        sqlite recreates the FTS5 table, whose columns follow `searchable`, and
+        refills it inside one transaction that searches wait for.
+        """
+        db = db or self.model._choose_db(True)
+        if self.dialect(db) == "postgres":
+            await self.ensure(db)
+            return await self.reindex(chunk_size, db)
+        async with db._in_transaction() as connection:
+            await self.drop(connection)
+            await self.ensure(connection)
+            return await self.reindex(chunk_size, connection)
+
+    async def reindex(self, chunk_size: int, db) -> int:
+        indexed = 0
+        async for instances in self.model.all().using_db(db).chunk(chunk_size, keyset=True):
+            await self.index(instances, db)
+            indexed += len(instances)
+        return indexed
+
+    def query(self, dialect: str, text: str) -> str:
+        if dialect == "postgres":
+            return f"websearch_to_tsquery({self.literal(self.language)}, {self.literal(text)})"
+        # Quote every term so user input cannot use (or break on) FTS5 query syntax
+        terms = ' '.join('"' + term.replace('"', '""') + '"' for term in text.split())
+        return self.literal(terms)
+
+    def match(self, dialect: str, text: str) -> RawSQL:
+        """Subquery of the primary keys matching `text`, for a `pk__in` filter."""
+        if dialect == "postgres":
+            return RawSQL(f'(SELECT "id" FROM "{self.table}" WHERE "document" @@ {self.query(dialect, text)})')
+        return RawSQL(f'(SELECT rowid FROM "{self.table}" WHERE "{self.table}" MATCH {self.query(dialect, text)})')
+
+    def rank(self, dialect: str, text: str) -> RawSQL:
+        """Relevance of the current row, higher is better."""
+        row = f'"{self.source_table}"."{self.pk_column}"'
+        if dialect == "postgres":
+            return RawSQL(
+                f'(SELECT ts_rank_cd("document", {self.query(dialect, text)}) FROM "{self.table}" WHERE "id" = {row})')
+        weights = ', '.join(str(float(len(self.fields) - position)) for position in range(len(self.fields)))
+        return RawSQL(
+            f'(SELECT -bm25("{self.table}", {weights}) FROM "{self.table}" '
+            f'WHERE "{self.table}" MATCH {self.query(dialect, text)} AND rowid = {row})')
+
+
+class Searchable:
+    """Model mixin keeping a full-text index of `searchable` in sync.
+
+        class Post(Searchable, Model):
+            searchable = ('title', 'body')
+
+        posts = await Post.search('async orm').limit(20)
+
+    Earlier fields weigh more in the ranking. The index tables are created
+    when the database is configured. Writes that bypass instances
+    (`update()`, `insert_many()` ...) are not indexed; run `db.search.rebuild` after them.
+    """
+
+    searchable: tuple = ()
+    search_language: str = 'english'
+
+    @classmethod
+    def _prepare_class(cls):
+        super()._prepare_class()
+        if cls.searchable and not cls._meta.abstract:
+            cls.register_listener(Signals.post_save, index_instance)
+            cls.register_listener(Signals.post_delete, remove_instance)
+
+
+async def index_instance(sender, instance, created, using_db, update_fields):
+    index = SearchIndex.of(sender)
+    if created or not update_fields or any(name in index.fields for name in update_fields):
+        await index.index([instance], using_db)
+
+
+async def remove_instance(sender, instance, using_db):
+    await SearchIndex.of(sender).remove([instance.pk], using_db)
+
+
+def searchable_models(apps: dict) -> list:
+    return [
+        model for models in apps.values() for model in models.values()
+        if getattr(model, 'searchable', None) and not model._meta.abstract
+    ]
+
+
+async def install_search_indexes(apps: dict):
+    """Create missing search tables at boot, so neither searches nor writes run DDL."""
+    for model in searchable_models(apps):
+        try:
+            await SearchIndex.of(model).ensure(model._choose_db(True))
+        except Exception as e:
+            logging.warning(f"Search index of {model.__name__} not created ({e}); "
+                            f"run db.search.rebuild once its table exists.")
@@ -22,6 +22,7 @@ class Application(Container, ApplicationContract):
 
     _booting_callbacks: list = []
     _booted_callbacks: list = []
+    _terminating_callbacks: list = []
 
     def get_env_path(self):
         """Get the path to the environment file directory."""
@@ -72,6 +73,19 @@ class Application(Container, ApplicationContract):
         for callback in callbacks:
             callback(self)
 
+    def terminating(self, callback: callable):
+        """
+        Register a callback to run when the application shuts down.
+        """
+        self._terminating_callbacks.append(callback)
+        return self
+
+    async def terminate(self):
+        for callback in self._terminating_callbacks:
+            result = callback(self)
+            if inspect.isawaitable(result):
+                await result
+
     def is_booted(self) -> bool:
         return self._booted
     
@@ -4,6 +4,9 @@ from diracore.foundation.bootstrap import load_configuration, load_environment,
 from contextlib import asynccontextmanager
 import os
 from fastapi.responses import ORJSONResponse
+from diracore.database.middleware import QueryScopeMiddleware
+from diracore.support.deadline import DeadlineExceeded
+from diracore.support.http.deadline import DeadlineMiddleware, deadline_exceeded_handler
 
 class HttpKernel:
     _app: any
@@ -11,6 +14,12 @@ class HttpKernel:
     server: any
     _routes: list = []
 
+    # ASGI middleware wrapped around the whole application
+    _middleware: list = [
+        QueryScopeMiddleware,
+        DeadlineMiddleware,
+    ]
+
     __bootstrappers: dict = [
         load_environment.LoadEnvironment,
         load_configuration.LoadConfiguration,
@@ -35,6 +44,7 @@ class HttpKernel:
     async def lifespan(self, app: FastAPI):
         await self.bootstrap()
         yield
+        await self._app.terminate()
 
     def sync_middleware_to_router(self):
         return
@@ -50,6 +60,9 @@ class HttpKernel:
             dependencies=dependencies,
             default_response_class=ORJSONResponse
         )
+        self.server.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+        for middleware in self._middleware:
+            self.server.add_middleware(middleware)
         
     def send(self):
         return self.server
\ No newline at end of file
@@ -3,6 +3,10 @@ from diracore.support.service_provider import ServiceProvider
 from diracore.routing.router import HttpRoute, RouteList
 from diracore.foundation.application import Application
 
+from diracore.support.http.auth.abilities import AbilityRegistry, UnknownAbility, require_abilities
+from diracore.support.http.fields import sparse_fields
+from diracore.support.http.deadline import route_timeout
+
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 from fastapi.datastructures import Default
@@ -33,7 +37,7 @@ class RouteServiceProvider(ServiceProvider):
                 endpoint=route.enpoint, 
                 methods=route.methods,
                 response_model_by_alias=True,
-                dependencies=[Depends(middleware) for middleware in route.middlewares],
+                dependencies=self.build_dependencies(route),
                 name=route._name,
                 response_class=route.response_class if route.response_class else Default(JSONResponse)
                 )
@@ -41,3 +45,24 @@ class RouteServiceProvider(ServiceProvider):
             self.server.include_router(api_router)
         if hasattr(self.kernel, '_router'):
             self.kernel._router = api_router
+
+    def build_dependencies(self, route: HttpRoute) -> list:
+        dependencies = [Depends(middleware) for middleware in route.middlewares]
+        if route._abilities:
+            # Compiled once here so the per-request check is a single AND
+            try:
+                route.abilities_mask = self.ability_registry().mask(route._abilities)
+            except UnknownAbility as e:
+                raise RuntimeError(f"Route [{route.path}]: {e}") from None
+            dependencies.append(Depends(require_abilities(route.abilities_mask)))
+        if route._fields:
+            dependencies.append(Depends(sparse_fields(*route._fields)))
+        if route._timeout is not None:
+            dependencies.append(Depends(route_timeout(route._timeout)))
+        return dependencies
+
+    def ability_registry(self) -> AbilityRegistry:
+        registry = self.app.make('auth.abilities')
+        if registry is None:
+            raise RuntimeError("Routes with abilities require the AuthServiceProvider to be registered.")
+        return registry
@@ -9,10 +9,11 @@ def cli():
     pass
 
 def config(path: str, default=None):
+    """Value at the dotted `path` of the app config; `default` when a key is missing or the value is None."""
     config_dict: dict = app.make('config')
     keys = path.split('.')
     for key in keys:
         if config_dict is None:
             return default
         config_dict = config_dict.get(key)
-    return config_dict
\ No newline at end of file
+    return default if config_dict is None else config_dict
\ No newline at end of file
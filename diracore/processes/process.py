@@ -13,6 +13,9 @@ from tortoise.backends.asyncpg.client import AsyncpgDBClient
 
 
 class BaseProcess(Process):
+    # Overrides the configured pool size for this process type when set
+    pool_max_size: int = None
+
     def run(self) -> None:
         self._target = self._target or self.handle            
         loop = asyncio.new_event_loop()
@@ -63,7 +66,8 @@ class BaseProcess(Process):
 
     async def register_db(self):
         connect: AsyncpgDBClient = self.db_connection()
-        connect.pool_maxsize = 10
+        if self.pool_max_size and hasattr(connect, 'pool_maxsize'):
+            connect.pool_maxsize = self.pool_max_size
         await connect.create_connection(True)
     
     async def on_startup(self):
@@ -169,6 +169,9 @@ class JobBase(ABC):
 
 
 class Job(JobBase):
+    """Overrides the configured pool size for this job's process when set"""
+    pool_max_size: int = None
+
     def app(self, abstract=ABSTRACT|None)->ABSTRACT|Application|None:
         return app.make(abstract) if abstract else app
 
@@ -182,9 +185,14 @@ class Job(JobBase):
 
     async def register_db(self):
         connect: AsyncpgDBClient = self.db_connection()
-        connect.pool_maxsize = 10
+        if self.pool_max_size and hasattr(connect, 'pool_maxsize'):
+            connect.pool_maxsize = self.pool_max_size
         await connect.create_connection(True)
     
+    async def lifespan(self, func, *args, **kwargs):
+        async with self.db().scope(self.get_job_name()):
+            return await super().lifespan(func, *args, **kwargs)
+
     async def on_startup(self):
         await self.register_db()
 
@@ -25,6 +25,9 @@ class HttpRoute:
         self.enpoint = endpoint
         self.methods = methods
         self._tags = []
+        self._abilities = []
+        self._fields = None
+        self._timeout = None
         self._name = name
         self.response_class=response_class
         self.default_response_class=default_response_class
@@ -41,6 +44,20 @@ class HttpRoute:
         self._tags.append(*tags)
         return self
     
+    def can(self, *abilities):
+        self._abilities.extend(abilities)
+        return self
+
+    def fields(self, model, *allowed, default: tuple = None):
+        """Accept `?fields=a,b` limited to `allowed` (default: the model's visible fields)."""
+        self._fields = (model, tuple(allowed) or None, tuple(default) if default else None)
+        return self
+    
+    def timeout(self, seconds: float):
+        """Cancel the request (and its running query) with a 504 after `seconds`."""
+        self._timeout = seconds
+        return self
+
     def name(self, name):
         self._name = name
         return self
@@ -90,6 +107,7 @@ class RouteBuild:
         self.routes: list = []
         self.middlewares: list = []
         self._tags: list = []
+        self._abilities: list = []
         self._response_class=None
         self.default_response_class=JSONResponse
 
@@ -141,6 +159,7 @@ class RouteBuild:
             self.build_prefix(route, group)
             self.build_middleware(route, group)
             self.build_tags(route, group)
+            self.build_abilities(route, group)
             if isinstance(route, HttpRoute):
                 self.build_config(route)
 
@@ -177,6 +196,14 @@ class RouteBuild:
         route._tags = list(unique_tags)
         return route
 
+    def build_abilities(self, route: HttpRoute, group):
+        abilities = list(route._abilities)
+        for scope in (self, group):
+            if isinstance(scope, RouteBuild):
+                abilities += [ability for ability in scope._abilities if ability not in abilities]
+        route._abilities = abilities
+        return route
+
 class RouteList(RouteBuild):
     def get(self, path: str, endpoint):
         route = Route.get(path, endpoint)
@@ -225,6 +252,10 @@ class RouteList(RouteBuild):
         self._tags.extend(tags)
         return self
     
+    def can(self, *abilities):
+        self._abilities.extend(abilities)
+        return self
+    
     def make_middlewares(self, middlewares):
         from diracore.main import app
         _middlewares = []
@@ -4,6 +4,7 @@ from pydantic import Field
 from .app import AppConfig
 from .database import DatabaseConfig
 from .auth import AuthConfig
+from .hashing import HashingConfig
 
 class Config(BaseSettings):
     model_config = SettingsConfigDict(
@@ -14,4 +15,5 @@ class Config(BaseSettings):
     )
     app: AppConfig = Field(default_factory=AppConfig)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
-    auth: AuthConfig = Field(default_factory=AuthConfig)
\ No newline at end of file
+    auth: AuthConfig = Field(default_factory=AuthConfig)
+    hashing: HashingConfig = Field(default_factory=HashingConfig)
\ No newline at end of file
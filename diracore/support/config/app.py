@@ -25,6 +25,8 @@ class AppConfig(BaseSettings):
     url: str = Field(alias='app_url', default='localhost')
     host: str = Field(alias='app_host', default=default_url()[0])
     port: str|int = Field(alias='app_port', default=default_url()[1])
+    # Seconds before a request is cancelled with a 504, overridable per route with HttpRoute.timeout()
+    request_timeout: float|None = Field(alias='app_request_timeout', default=None)
 
     providers: Tuple[Any]|List[Any] = ServiceProvider.default_list(),
     middlewares: Dict[str, Any] = {
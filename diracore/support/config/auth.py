@@ -4,4 +4,14 @@ from pydantic_settings import BaseSettings
 class AuthConfig(BaseSettings):
     secret_key: str = Field(alias='auth_secret_key', default='your-secret-key')
     algorithm: str = Field(alias='auth_algorithm', default='HS256')
-    token_expire_minutes: int = Field(alias='auth_token_expire_minutes', default=2*60)
\ No newline at end of file
+    token_expire_minutes: int = Field(alias='auth_token_expire_minutes', default=2*60)
+    stateless: bool = Field(alias='auth_stateless', default=False)
+    audit_tokens: bool = Field(alias='auth_audit_tokens', default=True)
+    # Hash passwords on register and rehash on login through the 'hash' service; off when the User model hashes on save
+    hash_passwords: bool = Field(alias='auth_hash_passwords', default=False)
+    revocation_sync_interval: float = Field(alias='auth_revocation_sync_interval', default=5)
+    revocation_bloom: bool = Field(alias='auth_revocation_bloom', default=False)
+    track_last_used: bool = Field(alias='auth_track_last_used', default=True)
+    last_used_flush_interval: float = Field(alias='auth_last_used_flush_interval', default=60)
+    last_used_max_staleness: float = Field(alias='auth_last_used_max_staleness', default=300)
+    abilities: list[str] = Field(default=[])
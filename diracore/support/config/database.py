@@ -1,12 +1,14 @@
 from pydantic import Field, BaseModel
 from pydantic_settings import BaseSettings
 from typing import Any
+from diracore.database.manifest import ModelManifest
 
-import os
-import itertools
+import importlib.util
 
 
 class ConnectionDBConfig(BaseSettings):
+    # pgsql, mysql or sqlite; defaults to the connection name
+    driver: str = Field(alias='db_driver', default=None)
     url: str = Field(alias='db_url', default=None)
     host: str = Field(alias='db_host', default='127.0.0.1')
     port: str|int = Field(alias='db_port', default='5432')
@@ -19,10 +21,50 @@ class ConnectionDBConfig(BaseSettings):
     search_path: str = Field(default='public')
     sslmode: str = Field(default='prefer')
     file_path: str = Field(alias='db_path', default=None)
+    # Read replicas: each entry overrides host/port/credentials of the primary
+    read: list[dict] = Field(default=[])
+    read_strategy: str = Field(alias='db_read_strategy', default='round_robin')
+    sticky: bool = Field(alias='db_sticky', default=True)
+    pool_min_size: int = Field(alias='db_pool_min_size', default=1)
+    pool_max_size: int = Field(alias='db_pool_max_size', default=10)
+    pool_max_queries: int = Field(alias='db_pool_max_queries', default=50000)
+    pool_max_inactive_lifetime: float = Field(alias='db_pool_max_inactive_lifetime', default=300.0)
+    pool_acquire_timeout: float = Field(alias='db_pool_acquire_timeout', default=None)
+    # Server-side cap (seconds) on every statement, a backstop for the request deadline
+    statement_timeout: float = Field(alias='db_statement_timeout', default=None)
+
+
+class InstrumentationDBConfig(BaseModel):
+    enabled: bool = True
+    # Statements slower than this are logged; None disables the slow-query log
+    slow_query_ms: float | None = 500
+    # Attach the EXPLAIN plan of slow SELECTs to the log entry
+    explain: bool = False
+    # Warn when one request or job repeats the same query shape this often
+    n_plus_one_threshold: int = 10
+    # Send X-DB-Query-Count / X-DB-Query-Time headers with every response
+    debug_headers: bool = False
+
+
+class CacheDBConfig(BaseModel):
+    # Keep cached rows in Redis and broadcast invalidations to other workers
+    redis: bool = True
+    max_entries: int = 1024
+    prefix: str = "db:cache:"
+    channel: str = "db:cache:invalidate"
+
+
+class IncrementsDBConfig(BaseModel):
+    # Accumulate Model.increment_buffered() deltas in Redis (shared by workers) instead of in process
+    redis: bool = True
+    flush_interval: float = 5
+    prefix: str = "db:increments:"
 
 
 class ModelsDBConfig(BaseModel):
     path: list[str] = ["app/entity/"]
+    # Written by `db.manifest`; boot falls back to scanning `path` while it is missing or stale
+    manifest: str = "bootstrap/cache/models.json"
 
 
 class DatabaseConfig(BaseSettings):
@@ -31,74 +73,105 @@ class DatabaseConfig(BaseSettings):
         "pgsql": Field(default_factory=ConnectionDBConfig)
     })
     models: ModelsDBConfig = ModelsDBConfig()
+    instrumentation: InstrumentationDBConfig = InstrumentationDBConfig()
+    cache: CacheDBConfig = CacheDBConfig()
+    increments: IncrementsDBConfig = IncrementsDBConfig()
+    # Reuse instances already loaded by pk within a request or job
+    identity_map: bool = Field(alias='db_identity_map', default=False)
+    # Batch single pk lookups (get, get_or_none, foreign keys) of one loop tick inside identity-map scopes
+    batch_lookups: bool = Field(alias='db_batch_lookups', default=True)
+    # Extra Tortoise apps, e.g. {"analytics": {"models": [...], "default_connection": "analytics"}}
+    apps: dict = Field(default={})
     
     def get_engine(self, name=None):
         match name:
             case "pgsql":
-                return "tortoise.backends.asyncpg"
+                return "diracore.database.backends.asyncpg"
             case "mysql":
                 return "tortoise.backends.mysql"
             case "sqlite":
-                return "tortoise.backends.sqlite"
+                return "diracore.database.backends.sqlite"
             case _:
-                if self.default:
-                    return self.get_engine(self.default)
+                if self.default and self.default != name:
+                    return self.get_engine(self.get_driver(self.default))
                 return None
+
+    def get_driver(self, name) -> str:
+        config = self.connections.get(name) or {}
+        return config.get("driver") or name
             
     def get_models(self):
-        model_directory = self.models.path
-        
-        models = []
-        for directory in model_directory:
-            models.append(self.get_filenames(directory))
-        models = list(itertools.chain(*models))
-        return models
+        return self.get_manifest().modules(self.get_model_paths())
+
+    def get_model_paths(self) -> list:
+        return self.models.path if isinstance(self.models, ModelsDBConfig) else self.models.get("path", [])
+
+    def get_manifest(self) -> ModelManifest:
+        path = self.models.manifest if isinstance(self.models, ModelsDBConfig) else self.models.get("manifest")
+        return ModelManifest(path or ModelsDBConfig().manifest)
     
     def get_filenames(self, directory) -> list:
-        try:
-            filenames = os.listdir(directory)
-            if "__pycache__" in filenames:
-                filenames.remove("__pycache__")
-            if not directory.endswith('/'):
-                directory += "/"
-            directory = directory.replace("/", ".")
-            listmodules = [directory + filename.rstrip('.py') for filename in filenames]
-            return listmodules
-        except FileNotFoundError:
-            print(f"Directory {directory} not found for models")
-            return []
-        
-    
+        return ModelManifest.scan([directory])
+
     def get_connection_config(self):
         connection_configs = {}
         for name, config in self.connections.items():
-            if name == "sqlite":
-                file_path = config.get("file_path")
-                connection_configs[name] = f"sqlite://{file_path}"
-            else:
-                connection_configs[name] = {
-                    "engine": self.get_engine(name),
-                    "credentials": {
-                        "host": config.get("host"),
-                        "port": config.get("port"),
-                        "user": config.get("username"),
-                        "password": config.get("password"),
-                        "database": config.get("database"),
-                        "ssl": config.get("sslmode") if config.get("sslmode") else None,
-                    }
-                }
+            connection_configs[name] = self.get_credentials(name, config)
+            for replica_name, replica in self.get_replicas(name).items():
+                connection_configs[replica_name] = self.get_credentials(name, config | replica)
         return connection_configs
+
+    def get_replicas(self, name) -> dict:
+        config = self.connections.get(name) or {}
+        return {f"{name}::read::{index}": replica for index, replica in enumerate(config.get("read") or [])}
+
+    def get_credentials(self, name, config: dict):
+        name = config.get("driver") or name
+        if name == "sqlite":
+            return {
+                "engine": self.get_engine(name),
+                "credentials": {"file_path": config.get("file_path") or config.get("url")},
+            }
+        engine = self.get_engine(name)
+        credentials = {
+            "engine": engine,
+            "credentials": {
+                "host": config.get("host"),
+                "port": config.get("port"),
+                "user": config.get("username"),
+                "password": config.get("password"),
+                "database": config.get("database"),
+                "ssl": config.get("sslmode") if config.get("sslmode") else None,
+                "minsize": config.get("pool_min_size") or 1,
+                "maxsize": config.get("pool_max_size") or 10,
+                "max_queries": config.get("pool_max_queries") or 50000,
+                "max_inactive_connection_lifetime": config.get("pool_max_inactive_lifetime") or 300.0,
+            }
+        }
+        if engine.startswith("diracore."):
+            credentials["credentials"]["acquire_timeout"] = config.get("pool_acquire_timeout")
+        if name == "pgsql" and config.get("statement_timeout"):
+            credentials["credentials"]["server_settings"] = {
+                "statement_timeout": str(int(config["statement_timeout"] * 1000)),
+            }
+        return credentials
     
-    def tortoise_config(self):
+    def tortoise_config(self, models: list = None):
         connection_configs = self.get_connection_config()
-        
+        models = list(models if models is not None else self.get_models())
+        if importlib.util.find_spec("aerich"):
+            models.append("aerich.models")
+
         config = {
             "connections": connection_configs,
             "apps": {
                 "models": {
-                    "models": self.get_models() + ["aerich.models"],
+                    "models": models,
                     "default_connection": self.default,
-                }
+                },
+                **self.apps,
             }
         }
-        return config
\ No newline at end of file
+        if any(self.get_replicas(name) for name in self.connections):
+            config["routers"] = ["diracore.database.router.ReadWriteRouter"]
+        return config
@@ -0,0 +1,12 @@
+from pydantic import Field, BaseModel
+from pydantic_settings import BaseSettings
+
+
+class BcryptHashingConfig(BaseSettings):
+    rounds: int = Field(alias='bcrypt_rounds', default=12)
+    max_workers: int = Field(alias='hash_max_workers', default=4)
+
+
+class HashingConfig(BaseModel):
+    driver: str = 'bcrypt'
+    bcrypt: BcryptHashingConfig = Field(default_factory=BcryptHashingConfig)
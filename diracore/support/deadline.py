@@ -0,0 +1,50 @@
+from contextvars import ContextVar
+from contextlib import contextmanager
+
+import asyncio
+import time
+
+_current_deadline: ContextVar['Deadline'] = ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    """Point in (monotonic) time by which the current request must be done."""
+    __slots__ = ('started', 'at', 'timeout')
+
+    def __init__(self, seconds: float = None) -> None:
+        self.started = time.monotonic()
+        self.at = None if seconds is None else self.started + seconds
+        # asyncio.Timeout enforcing it, set by the DeadlineMiddleware
+        self.timeout: asyncio.Timeout = None
+
+    def extend_to(self, seconds: float):
+        """Move the deadline to `seconds` after the request started."""
+        self.at = self.started + seconds
+        if self.timeout is not None and not self.timeout.expired():
+            self.timeout.reschedule(asyncio.get_running_loop().time() + self.remaining())
+
+    def remaining(self) -> float | None:
+        return None if self.at is None else self.at - time.monotonic()
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+def remaining() -> float | None:
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+@contextmanager
+def deadline(seconds: float = None):
+    current = Deadline(seconds)
+    token = _current_deadline.set(current)
+    try:
+        yield current
+    finally:
+        _current_deadline.reset(token)
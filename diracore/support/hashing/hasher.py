@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import bcrypt
+
+
+class BcryptHasher:
+    """Hashes and verifies passwords off the event loop.
+
+    bcrypt releases the GIL while it works, so a small thread pool is enough
+    to keep a login burst from stalling every other request on the worker.
+    The semaphore caps how many hashes run at once; callers beyond the cap
+    wait on the loop instead of queueing inside the executor.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 4) -> None:
+        self.rounds = int(rounds)
+        self.max_workers = int(max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='hasher')
+        self._semaphore: asyncio.Semaphore = None
+
+    async def make(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._run(bcrypt.hashpw, password.encode(), salt)
+        return hashed.decode()
+
+    async def check(self, password: str, hashed: str) -> bool:
+        if not password or not hashed:
+            return False
+        try:
+            return await self._run(bcrypt.checkpw, password.encode(), hashed.encode())
+        except ValueError:
+            # Not a bcrypt hash (e.g. a legacy plain value)
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self.get_rounds(hashed) != self.rounds
+
+    @staticmethod
+    def get_rounds(hashed: str) -> int | None:
+        # $2b$12$<salt+hash>
+        parts = hashed.split('$') if hashed else []
+        if len(parts) < 4 or not parts[2].isdigit():
+            return None
+        return int(parts[2])
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
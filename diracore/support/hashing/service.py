@@ -0,0 +1,12 @@
+from diracore.support.service_provider import ServiceProvider
+from diracore.main import config
+from .hasher import BcryptHasher
+
+
+class HashServiceProvider(ServiceProvider):
+    def register(self):
+        self.app.singleton(BcryptHasher, lambda: BcryptHasher(
+            rounds=config('hashing.bcrypt.rounds', 12),
+            max_workers=config('hashing.bcrypt.max_workers', 4),
+        ))
+        self.app.bind('hash', lambda: self.app.make(BcryptHasher))
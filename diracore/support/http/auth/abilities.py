@@ -0,0 +1,56 @@
+from fastapi import HTTPException, Request, status
+
+ALL_ABILITIES = -1
+
+
+class UnknownAbility(ValueError):
+    pass
+
+
+class AbilityRegistry:
+    """Maps ability names to bit positions so checks are a single AND.
+
+    Tokens carry the mask, not the names, so bit positions have to be stable
+    across workers and deploys: only abilities declared in `auth.abilities`
+    get a bit, in that order. Add new abilities to the end of the list and
+    never remove or reorder entries.
+    """
+    wildcard = '*'
+
+    def __init__(self, abilities: list = None) -> None:
+        self._bits: dict[str, int] = {}
+        for ability in abilities or []:
+            if ability not in self._bits:
+                self._bits[ability] = 1 << len(self._bits)
+
+    def bit(self, ability: str) -> int:
+        try:
+            return self._bits[ability]
+        except KeyError:
+            raise UnknownAbility(f"Ability [{ability}] is not declared in auth.abilities.") from None
+
+    def mask(self, abilities) -> int:
+        if isinstance(abilities, str):
+            abilities = [abilities]
+        mask = 0
+        for ability in abilities or []:
+            if ability == self.wildcard:
+                return ALL_ABILITIES
+            mask |= self.bit(ability)
+        return mask
+
+    def names(self, mask: int) -> list:
+        if mask == ALL_ABILITIES:
+            return [self.wildcard]
+        return [ability for ability, bit in self._bits.items() if mask & bit]
+
+
+def require_abilities(mask: int):
+    async def check_abilities(request: Request):
+        granted = request.scope.get("token_abilities")
+        if granted is None or granted & mask != mask:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, 
+                detail="The access token does not have the required abilities."
+            )
+    return check_abilities
@@ -3,5 +3,14 @@ import os
 config = {
     'secret_key': os.getenv('AUTH_SECRET_KEY', 'your-secret-key'),
     'algorithm': os.getenv('AUTH_ALGORITHM', 'HS256'),
-    'token_expire_minutes': os.getenv('AUTH_TOKEN_EXPIRE_MINUTES', 2*60)
-}
\ No newline at end of file
+    'token_expire_minutes': os.getenv('AUTH_TOKEN_EXPIRE_MINUTES', 2*60),
+    'stateless': os.getenv('AUTH_STATELESS', 'false').lower() == 'true',
+    'audit_tokens': os.getenv('AUTH_AUDIT_TOKENS', 'true').lower() == 'true',
+    'revocation_sync_interval': float(os.getenv('AUTH_REVOCATION_SYNC_INTERVAL', 5)),
+    'revocation_bloom': os.getenv('AUTH_REVOCATION_BLOOM', 'false').lower() == 'true',
+    'track_last_used': os.getenv('AUTH_TRACK_LAST_USED', 'true').lower() == 'true',
+    'last_used_flush_interval': float(os.getenv('AUTH_LAST_USED_FLUSH_INTERVAL', 60)),
+    'last_used_max_staleness': float(os.getenv('AUTH_LAST_USED_MAX_STALENESS', 300)),
+    # Every ability used by routes or tokens, append-only: the order fixes the token bit of each
+    'abilities': [],
+}
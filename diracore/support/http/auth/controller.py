@@ -6,10 +6,9 @@ from fastapi import HTTPException
 from diracore.support.http.auth.middleware import JWTAuthentication
 from diracore.support.http.auth.resource import *
 from diracore.main import app
-from tortoise.expressions import Q
+from tortoise.exceptions import IntegrityError
 
 import random
-import bcrypt
 
 class AuthenticationController:
     async def login(request_form: UserLoginRequestForm):
@@ -40,17 +39,20 @@ class AuthenticationController:
         }
 
     async def register(request_form: UserRegisterRequestForm):
-        user_exists = await User.filter(Q(username=request_form.username) | Q(email=request_form.email)).exists()
-        if user_exists:
+        jwt: JWTAuthentication = app.make(JWTAuthentication)
+        password = request_form.password
+        if jwt.hash_passwords:
+            password = await jwt.hasher.make(password)
+        try:
+            # The unique constraints decide, there is no pre-check round trip
+            user = await User.create(
+                username=request_form.username or f"User-{random.randint(1, 99999):04d}",
+                email=request_form.email,
+                password=password
+            )
+        except IntegrityError:
             raise HTTPException(status_code=400, detail="Username or Email already exists")
 
-        user = await User.create(
-            username=request_form.username or f"User-{random.randint(1, 99999):04d}",
-            email=request_form.email,
-            password=request_form.password
-        )
-
-        jwt: JWTAuthentication = app.make(JWTAuthentication)
         personal_token = await jwt.create_access_token(user.id, data={
             "sub": user.username, 
             "id": user.id
@@ -79,6 +81,8 @@ class AuthenticationController:
     async def logout(request_form: UserLoginRequestForm):
         jwt: JWTAuthentication = app.make(JWTAuthentication)
         user: User = await jwt.authenticate_user(request_form)
+        if jwt.stateless:
+            await jwt.revoke_user(user.id)
         tokens = await PersonalAccessToken.filter(user_id=user.id).delete()
 
         return {
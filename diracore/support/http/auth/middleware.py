@@ -10,15 +10,66 @@ from app.entity.personal_access_token import PersonalAccessToken
 from .form import UserLoginRequestForm
 from fastapi import Request
 
-import bcrypt
 from diracore.contracts.foundation.application import Application
+from diracore.support.hashing.hasher import BcryptHasher
+from .revocation import TokenRevocationList
+from .usage import TokenUsageBuffer
+from .abilities import AbilityRegistry, ALL_ABILITIES
+
+import asyncio
+import json
+import logging
+import time
+import uuid
 
 class JWTAuthentication():
-    def __init__(self, secret_key: str, algorithm: str, token_expire_minutes: int, user_model: Model):
+    def __init__(
+            self, 
+            secret_key: str, 
+            algorithm: str, 
+            token_expire_minutes: int, 
+            user_model: Model, 
+            hasher: BcryptHasher = None,
+            stateless: bool = False,
+            audit_tokens: bool = True,
+            revocations: TokenRevocationList = None,
+            usage: TokenUsageBuffer = None,
+            hash_passwords: bool = False,
+        ):
         self.secret_key = secret_key
         self.algorithm = algorithm
         self.token_expire_minutes = int(token_expire_minutes)
         self.user_model = user_model
+        self.stateless = stateless
+        self.audit_tokens = audit_tokens
+        self._hasher = hasher
+        self._revocations = revocations
+        self.usage = usage
+        # Whether the framework writes password hashes itself; off for User models that hash on save
+        self.hash_passwords = hash_passwords
+        self._background: set = set()
+        self._user_by_token = user_model.compile(
+            lambda credentials, user_id, now: user_model.where_actual_token(credentials, now).get_or_none(id=user_id)
+        ) if hasattr(user_model, 'compile') else None
+
+    @property
+    def hasher(self) -> BcryptHasher:
+        if self._hasher is None:
+            from diracore.main import app
+            self._hasher = app.make('hash')
+        return self._hasher
+
+    @property
+    def abilities(self) -> AbilityRegistry:
+        from diracore.main import app
+        return app.make('auth.abilities')
+
+    @property
+    def revocations(self) -> TokenRevocationList:
+        if self._revocations is None:
+            from diracore.main import app
+            self._revocations = app.make('auth.revocations')
+        return self._revocations
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         return self
@@ -28,54 +79,104 @@ class JWTAuthentication():
             try:
                 payload = self.decode(token.credentials)
                 user_id: str = payload.get("id")
-                if user_id is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Could not validate credentials",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
+                if user_id is None or (self.stateless and not payload.get("jti")):
+                    raise self.credentials_exception()
             except JWTError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            user = await self.user_model.where_actual_token(token.credentials).get_or_none(id=user_id)
+                raise self.credentials_exception()
+            if self.stateless:
+                if await self.revocations.is_revoked(payload["jti"], user_id, payload.get("iat")):
+                    raise self.credentials_exception()
+                user = await self.user_model.get_or_none(id=user_id)
+            else:
+                user = await self.find_user_by_token(token.credentials, user_id)
             if user is None:
                 raise HTTPException(status_code=404, detail="User not found")
+            if self.usage is not None and payload.get("jti"):
+                self.usage.touch(payload["jti"])
             request.scope["user"] = user
+            # Tokens issued before abilities existed keep full access
+            request.scope["token_abilities"] = payload.get("abl", ALL_ABILITIES)
             return user
         
         return get_current_user
 
+    @staticmethod
+    def credentials_exception() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    async def find_user_by_token(self, credentials: str, user_id):
+        if self._user_by_token is None:
+            return await self.user_model.where_actual_token(credentials).get_or_none(id=user_id)
+        return await self._user_by_token(credentials, user_id, datetime.now())
+
     async def authenticate_user(self, form: UserLoginRequestForm) -> User:
         if form.username:
             user: User = await User.get_or_none(username=form.username)
         elif form.email:
             user: User = await User.get_or_none(email=form.email)
-        if not user or not bcrypt.checkpw(form.password.encode(), user.password.encode()):
+        if not user or not await self.hasher.check(form.password, user.password):
             raise HTTPException(status_code=404, detail="Account not found. Please check your credentials and try again.")
+        if self.hash_passwords and self.hasher.needs_rehash(user.password):
+            user.password = await self.hasher.make(form.password)
+            await user.save(update_fields=['password'])
         return user
 
-    async def create_access_token(self, user_id, data: dict, name=None, type='bearer') -> PersonalAccessToken:
+    async def create_access_token(self, user_id, data: dict, name=None, type='bearer', abilities: list = None) -> PersonalAccessToken:
+        jti = uuid.uuid4().hex
+        abilities = abilities or [AbilityRegistry.wildcard]
         to_encode = data.copy()
         expire = datetime.now() + timedelta(minutes=self.token_expire_minutes)
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "iat": time.time(), "jti": jti, "abl": self.abilities.mask(abilities)})
 
-        token_count = await PersonalAccessToken.filter(user_id=user_id).active().count()
-        name = name if name else f"Token-{token_count}"
+        # Named from the jti, so issuing a token is a single INSERT ... RETURNING
+        name = name if name else f"Token-{jti[:8]}"
 
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         now = datetime.now()
-        token = await PersonalAccessToken.create(
+        attributes = dict(
             user_id=user_id,
             name=name,
             type=type,
             credentials=encoded_jwt,
+            jti=jti,
+            abilities=json.dumps(abilities),
             last_used_at=now,
             expires_at=now+timedelta(minutes=self.token_expire_minutes)
         )
+        if not self.stateless:
+            return await PersonalAccessToken.create(**attributes)
+
+        # The row is only an audit record here, so the response doesn't wait for it
+        token = PersonalAccessToken(**attributes)
+        if self.audit_tokens:
+            self.dispatch(token.save())
         return token
+
+    async def revoke(self, credentials: str):
+        payload = self.decode(credentials)
+        await self.revocations.revoke(payload["jti"], payload["exp"])
+
+    async def revoke_user(self, user_id):
+        await self.revocations.revoke_user(user_id, self.token_expire_minutes * 60)
+
+    def dispatch(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+        return task
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            logging.error(f"Auth background task failed: {task.exception()}")
+
+    async def wait_background(self):
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
     
     def decode(self, token: str):
         payload = jwt.decode(
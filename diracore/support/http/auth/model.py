@@ -1,6 +1,6 @@
 from diracore.database.model import Model
 from tortoise import fields
-from tortoise.queryset import QuerySet
+from diracore.database.queryset import QuerySet
 from tortoise.expressions import Q
 
 from datetime import datetime
@@ -12,11 +12,13 @@ class User(Model):
 
     tokens = fields.ReverseRelation['PersonalAccessToken']
 
+    hidden = ('password',)
+
     class QuerySet(QuerySet):
-        def where_actual_token(self, token: str):
+        def where_actual_token(self, token: str, now: datetime = None):
             return self.filter(
                 Q(tokens__credentials=token) &
-                (Q(tokens__expires_at__gt=datetime.now()) | Q(tokens__expires_at__isnull=True))
+                (Q(tokens__expires_at__gt=now or datetime.now()) | Q(tokens__expires_at__isnull=True))
             )
 
 class PersonalAccessToken(Model):
@@ -25,6 +27,7 @@ class PersonalAccessToken(Model):
     name=fields.CharField(max_length=256)
 
     credentials=fields.CharField(max_length=256)
+    jti=fields.CharField(max_length=32, null=True, index=True)
     type=fields.CharField(max_length=256)
     abilities=fields.TextField(null=True)
 
@@ -34,6 +37,8 @@ class PersonalAccessToken(Model):
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
+    hidden = ('credentials',)
+
     class Meta:
         pass
 
@@ -0,0 +1,111 @@
+from redis.asyncio import Redis as ARedis
+from redis.exceptions import RedisError
+from diracore.support.periodic import PeriodicTask
+
+import hashlib
+import logging
+import time
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001) -> None:
+        import math
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little')
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class TokenRevocationList:
+    """Revoked token ids shared through Redis, checked against a local copy.
+
+    Entries live in a sorted set scored by the moment the token would have
+    expired anyway, so expired entries are pruned instead of piling up.
+    Members are either `jti:<jti>` for a single token or
+    `user:<id>:<timestamp>` for every token of a user issued before that time.
+    """
+
+    key = 'auth:revoked'
+
+    def __init__(self, redis: ARedis, sync_interval: float = 5, bloom: bool = False,
+                 bloom_capacity: int = 100_000, bloom_error_rate: float = 0.001) -> None:
+        self.redis = redis
+        self.use_bloom = bloom
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._tokens: dict[str, float] = {}
+        self._users: dict[str, float] = {}
+        self._bloom: BloomFilter = BloomFilter(bloom_capacity, bloom_error_rate) if bloom else None
+        self._sync = PeriodicTask(self.sync, sync_interval, name='auth:revocations-sync')
+
+    async def start(self):
+        self._sync.start(run_now=True)
+
+    async def stop(self):
+        await self._sync.stop()
+
+    async def revoke(self, jti: str, expires_at: float):
+        if expires_at <= time.time():
+            return
+        await self.redis.zadd(self.key, {f"jti:{jti}": expires_at})
+        self._remember(f"jti:{jti}", expires_at)
+
+    async def revoke_user(self, user_id, lifetime: float):
+        now = time.time()
+        member = f"user:{user_id}:{now}"
+        await self.redis.zadd(self.key, {member: now + lifetime})
+        self._remember(member, now + lifetime)
+
+    async def is_revoked(self, jti: str, user_id=None, issued_at: float = None) -> bool:
+        if user_id is not None and issued_at is not None:
+            revoked_before = self._users.get(str(user_id))
+            if revoked_before is not None and issued_at <= revoked_before:
+                return True
+        if not self.use_bloom:
+            expires_at = self._tokens.get(jti)
+            return expires_at is not None and expires_at > time.time()
+        if jti not in self._bloom:
+            return False
+        # Bloom filters give false positives; confirm the rare hit against Redis
+        try:
+            score = await self.redis.zscore(self.key, f"jti:{jti}")
+        except RedisError:
+            return True
+        return score is not None and score > time.time()
+
+    async def sync(self):
+        now = time.time()
+        try:
+            await self.redis.zremrangebyscore(self.key, '-inf', now)
+            entries = await self.redis.zrangebyscore(self.key, now, '+inf', withscores=True)
+        except RedisError as e:
+            logging.warning(f"Token revocation list sync failed: {e}")
+            return
+        self._tokens = {}
+        self._users = {}
+        self._bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate) if self.use_bloom else None
+        for member, expires_at in entries:
+            self._remember(member.decode() if isinstance(member, bytes) else member, expires_at)
+
+    def _remember(self, member: str, expires_at: float):
+        kind, _, value = member.partition(':')
+        if kind == 'user':
+            user_id, _, revoked_at = value.rpartition(':')
+            self._users[user_id] = max(self._users.get(user_id, 0), float(revoked_at))
+        elif self.use_bloom:
+            self._bloom.add(value)
+        else:
+            self._tokens[value] = expires_at
@@ -2,17 +2,59 @@ from diracore.contracts.foundation.application import Application
 from diracore.support.service_provider import ServiceProvider
 from diracore.main import config
 from .middleware import JWTAuthentication
+from .revocation import TokenRevocationList
+from .usage import TokenUsageBuffer
+from .abilities import AbilityRegistry
 from .model import User
 
+from redis.asyncio import Redis as ARedis
+
+import logging
+
 class AuthServiceProvider(ServiceProvider):
     async def register(self):
         self.app.bind(JWTAuthentication, self.jwt_middleware())
         self.app.bind('auth', lambda: self.app.make(JWTAuthentication))
+        self.app.singleton('auth.revocations', lambda: self.revocation_list())
+        self.app.singleton(AbilityRegistry, lambda: AbilityRegistry(config('auth.abilities', [])))
+        self.app.bind('auth.abilities', lambda: self.app.make(AbilityRegistry))
+
+    async def boot(self):
+        jwt: JWTAuthentication = self.app.make(JWTAuthentication)
+        if jwt.stateless:
+            await jwt.revocations.start()
+            self.app.terminating(lambda app: jwt.revocations.stop())
+        if jwt.usage is not None:
+            jwt.usage.start()
+            self.app.terminating(lambda app: jwt.usage.stop())
+        self.app.terminating(lambda app: jwt.wait_background())
 
     def jwt_middleware(self, user_model=User):
         return JWTAuthentication(
             secret_key=config('auth.secret_key'),
             algorithm=config('auth.algorithm'),
             token_expire_minutes=config('auth.token_expire_minutes'),
-            user_model=user_model
-        )
\ No newline at end of file
+            user_model=user_model,
+            stateless=config('auth.stateless', False),
+            audit_tokens=config('auth.audit_tokens', True),
+            hash_passwords=config('auth.hash_passwords', False),
+            usage=self.token_usage_buffer() if config('auth.track_last_used', True) else None,
+        )
+
+    def token_usage_buffer(self):
+        from app.entity.personal_access_token import PersonalAccessToken
+        if 'jti' not in PersonalAccessToken._meta.fields_map:
+            logging.warning("PersonalAccessToken has no indexed jti column, last_used_at is not tracked.")
+            return None
+        return TokenUsageBuffer(
+            PersonalAccessToken,
+            flush_interval=config('auth.last_used_flush_interval', 60),
+            max_staleness=config('auth.last_used_max_staleness', 300),
+        )
+
+    def revocation_list(self):
+        return TokenRevocationList(
+            redis=self.app.make(ARedis),
+            sync_interval=config('auth.revocation_sync_interval', 5),
+            bloom=config('auth.revocation_bloom', False),
+        )
@@ -0,0 +1,81 @@
+from pypika import Table, Case
+from tortoise.models import Model
+from diracore.support.periodic import PeriodicTask
+
+from datetime import datetime
+import logging
+import time
+
+
+class TokenUsageBuffer:
+    """Write-behind buffer for `last_used_at` of personal access tokens.
+
+    Requests only record the use in memory; a periodic flush writes every
+    pending token in one UPDATE ... SET last_used_at = CASE ... statement.
+    A token that was flushed less than `max_staleness` seconds ago is not
+    recorded again, so a busy token costs one write per staleness window.
+    Tokens are keyed by their jti, an indexed column the auth dependency
+    reads from the payload without an extra lookup. A batch that fails to
+    write is kept pending for the next flush.
+    """
+
+    batch_size: int = 500
+
+    def __init__(self, model: Model, flush_interval: float = 60, max_staleness: float = 300,
+                 column: str = 'last_used_at', key: str = 'jti') -> None:
+        self.model = model
+        self.column = column
+        self.key = key
+        self.max_staleness = float(max_staleness)
+        self._pending: dict[str, datetime] = {}
+        self._flushed: dict[str, float] = {}
+        self._flusher = PeriodicTask(self.flush, flush_interval, name='auth:token-usage-flush')
+
+    def start(self):
+        self._flusher.start()
+
+    async def stop(self):
+        await self._flusher.stop(run_once=True)
+
+    def touch(self, key: str, used_at: datetime = None):
+        flushed_at = self._flushed.get(key)
+        if flushed_at is not None and time.monotonic() - flushed_at < self.max_staleness:
+            return
+        self._pending[key] = used_at or datetime.now()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        written = []
+        for offset in range(0, len(items), self.batch_size):
+            batch = items[offset:offset + self.batch_size]
+            try:
+                await self._write(batch)
+            except Exception:
+                logging.exception("Flushing token usage failed, keeping it pending")
+                for key, used_at in batch:
+                    # A use recorded while flushing is newer
+                    self._pending.setdefault(key, used_at)
+            else:
+                written.extend(key for key, _ in batch)
+
+        now = time.monotonic()
+        self._flushed = {
+            key: flushed_at for key, flushed_at in self._flushed.items()
+            if now - flushed_at < self.max_staleness
+        }
+        self._flushed.update((key, now) for key in written)
+
+    async def _write(self, items: list):
+        db = self.model._meta.db
+        field = self.model._meta.fields_map[self.column]
+        table = Table(self.model._meta.db_table)
+
+        case = Case()
+        for key, used_at in items:
+            case = case.when(table[self.key] == key, field.to_db_value(used_at, None))
+        query = db.query_class.update(table).set(table[self.column], case).where(
+            table[self.key].isin([key for key, _ in items]))
+        await db.execute_query(query.get_sql())
@@ -0,0 +1,134 @@
+from fastapi import Request
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from diracore.support.deadline import Deadline, DeadlineExceeded, current_deadline, _current_deadline
+
+import asyncio
+
+# Whether any route declared a timeout; without one (and no app.request_timeout) requests pass straight through
+_route_timeouts = False
+
+
+class DisconnectWatcher:
+    """Passes the request body to the app as it asks for it and notices a disconnect meanwhile.
+
+    Only the first message is read ahead, which for bodiless requests is the
+    whole (empty) body. A longer body is left to the app, and the connection
+    is watched again once the app has all of it, so at most one message is held.
+    """
+
+    def __init__(self, receive: Receive, on_disconnect: callable) -> None:
+        loop = asyncio.get_running_loop()
+        self._receive = receive
+        self._on_disconnect = on_disconnect
+        self._first = loop.create_future()
+        self._body_read = asyncio.Event()
+        self.disconnected = False
+        self.task = loop.create_task(self.watch(self._first))
+
+    async def watch(self, first: asyncio.Future):
+        message = await self._receive()
+        first.set_result(message)
+        if message["type"] == "http.request" and message.get("more_body", False):
+            await self._body_read.wait()
+        while message["type"] != "http.disconnect":
+            message = await self._receive()
+        self.disconnected = True
+        self._on_disconnect()
+
+    async def receive(self) -> Message:
+        if self._first is not None:
+            first, self._first = self._first, None
+            message = await asyncio.shield(first)
+        elif self._body_read.is_set():
+            # The watcher reads the connection now and only a disconnect can come
+            await asyncio.shield(self.task)
+            return {"type": "http.disconnect"}
+        else:
+            message = await self._receive()
+        if message["type"] != "http.request" or not message.get("more_body", False):
+            self._body_read.set()
+        return message
+
+
+class DeadlineMiddleware:
+    """Runs each request against a deadline and stops it when nobody waits anymore.
+
+    The deadline comes from `app.request_timeout` and `HttpRoute.timeout()`,
+    both counted from the start of the request. When it passes the handler is
+    cancelled together with its in-flight queries, and a 504 is sent if the
+    response has not started yet. Requests that start with a deadline are also
+    cancelled when the client disconnects. Without any timeout configured the
+    middleware does nothing.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._default_timeout = ...
+
+    @property
+    def default_timeout(self) -> float | None:
+        if self._default_timeout is ...:
+            from diracore.main import config
+            self._default_timeout = config('app.request_timeout', None)
+        return self._default_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        default_timeout = self.default_timeout
+        if scope["type"] != "http" or (default_timeout is None and not _route_timeouts):
+            return await self.app(scope, receive, send)
+
+        loop = asyncio.get_running_loop()
+        request_deadline = Deadline(default_timeout)
+        response_started = False
+        watcher = None
+
+        async def send_tracked(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        def expire_now():
+            if not timeout.expired():
+                timeout.reschedule(loop.time())
+
+        token = _current_deadline.set(request_deadline)
+        try:
+            async with asyncio.timeout(request_deadline.remaining()) as timeout:
+                request_deadline.timeout = timeout
+                if request_deadline.at is not None:
+                    watcher = DisconnectWatcher(receive, expire_now)
+                    receive = watcher.receive
+                await self.app(scope, receive, send_tracked)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            if not response_started and not (watcher is not None and watcher.disconnected):
+                await gateway_timeout(scope, send)
+        finally:
+            _current_deadline.reset(token)
+            if watcher is not None:
+                watcher.task.cancel()
+
+
+async def gateway_timeout(scope: Scope, send: Send):
+    response = ORJSONResponse({"detail": "Request deadline exceeded."}, status_code=504)
+    await response(scope, None, send)
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return ORJSONResponse({"detail": str(exc) or "Request deadline exceeded."}, status_code=504)
+
+
+def route_timeout(seconds: float):
+    global _route_timeouts
+    _route_timeouts = True
+
+    async def apply_timeout():
+        current = current_deadline()
+        if current is None:
+            _current_deadline.set(Deadline(seconds))
+        else:
+            current.extend_to(seconds)
+    return apply_timeout
@@ -0,0 +1,14 @@
+from fastapi import HTTPException, Request, status
+from diracore.database.fieldsets import parse_fields, request_fields
+
+
+def sparse_fields(model, allowed: tuple = None, default: tuple = None):
+    async def select_fields(request: Request):
+        try:
+            fields = parse_fields(model, request.query_params.get('fields'), allowed)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        fields = fields or default
+        request_fields(fields)
+        request.scope["fields"] = fields
+    return select_fields
@@ -0,0 +1,49 @@
+import asyncio
+import inspect
+import logging
+
+
+class PeriodicTask:
+    """Runs a callback every `interval` seconds on the running event loop."""
+
+    def __init__(self, callback: callable, interval: float, name: str = None) -> None:
+        self.callback = callback
+        self.interval = float(interval)
+        self.name = name or getattr(callback, '__qualname__', 'periodic-task')
+        self._task: asyncio.Task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, run_now: bool = False):
+        if self.running:
+            return self
+        self._task = asyncio.get_running_loop().create_task(self._loop(run_now), name=self.name)
+        return self
+
+    async def stop(self, run_once: bool = False):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if run_once:
+            await self.run()
+
+    async def run(self):
+        try:
+            result = self.callback()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logging.exception(f"Periodic task [{self.name}] failed")
+
+    async def _loop(self, run_now: bool):
+        if run_now:
+            await self.run()
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run()
@@ -96,8 +96,10 @@ class DefaultServiceProviders():
         from diracore.database.providers.db_service import DatabaseServiceProvider
         from diracore.database.providers.redis_service import RedisServiceProvider
         from diracore.queue.queue_service import QueueServiceProvider
+        from diracore.support.hashing.service import HashServiceProvider
         
         self._providers = [
+            HashServiceProvider,
             DatabaseServiceProvider,
             RedisServiceProvider,
             QueueServiceProvider,
@@ -0,0 +1,62 @@
+from tortoise import Tortoise, fields
+from diracore.database.compiled import CompiledQuery
+from diracore.database.model import Model
+from datetime import datetime, timezone
+
+import asyncio
+
+
+class Account(Model):
+    id = fields.IntField(pk=True)
+    name = fields.CharField(max_length=50)
+    nickname = fields.CharField(max_length=50)
+
+    class Meta:
+        table = 'test_accounts'
+
+
+def run(test):
+    async def main():
+        await Tortoise.init(db_url='sqlite://:memory:', modules={'models': [__name__]})
+        await Tortoise.generate_schemas()
+        await Account.create(id=1, name='ann', nickname='ann')
+        await Account.create(id=2, name='bob', nickname='bobby')
+        try:
+            await test()
+        finally:
+            await Tortoise.close_connections()
+    asyncio.run(main())
+
+
+def test_compiles_each_marker_found_once():
+    async def test():
+        by_name = Account.compile(lambda name, id: Account.filter(name=name, id__gte=id))
+        assert [account.id for account in await by_name('bob', 1)] == [2]
+        assert [account.id for account in await by_name('ann', 1)] == [1]
+        plan, = by_name._plans.values()
+        assert plan is not None and 'bob' not in plan.sql
+    run(test)
+
+
+def test_falls_back_when_a_marker_is_not_in_the_sql():
+    async def test():
+        # `id` never reaches the query, so there is nothing to bind it to
+        by_name = Account.compile(lambda name, id: Account.filter(name=name))
+        assert [account.id for account in await by_name('bob', 1)] == [2]
+        assert list(by_name._plans.values()) == [None]
+    run(test)
+
+
+def test_falls_back_when_a_marker_appears_twice():
+    async def test():
+        same_names = Account.compile(lambda name: Account.filter(name=name, nickname=name))
+        assert [account.id for account in await same_names('ann')] == [1]
+        assert await same_names('bob') == []
+        assert list(same_names._plans.values()) == [None]
+    run(test)
+
+
+def test_only_aware_datetimes_get_a_marker():
+    assert CompiledQuery.marker(0, datetime(2024, 1, 1), 'postgres') is None
+    assert CompiledQuery.marker(0, datetime(2024, 1, 1, tzinfo=timezone.utc), 'postgres') is not None
+    assert CompiledQuery.marker(0, datetime(2024, 1, 1, tzinfo=timezone.utc), 'sqlite') is None